@@ -106,6 +106,10 @@ class Settings(BaseSettings):
     ai_api_key: str = Field(default="")
     ai_api_endpoint: str = Field(default="")
     ai_model: str = Field(default="")
+    ai_cache_enabled: bool = Field(default=False)
+    ai_cache_ttl: int = Field(default=3600)  # Seconds
+    ai_max_concurrent: int = Field(default=16)  # Per worker process
+    ai_max_retries: int = Field(default=5)
 
     # Models
     verify_user_model: bool = Field(default=True)
@@ -1,8 +1,22 @@
 # app/models/user_generated_question.py
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+import hashlib
+import json
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
@@ -14,6 +28,25 @@ class UserGeneratedQuestion(Base):
     """
 
     __tablename__ = "user_generated_questions"
+    __table_args__ = (
+        # Public listing: filter on is_public, newest first
+        Index("ix_ugq_public_created_at", "is_public", text("created_at DESC")),
+        # Trigram indexes let the public search's ILIKE '%term%' use an index
+        Index(
+            "ix_ugq_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_ugq_topic_trgm",
+            "topic",
+            postgresql_using="gin",
+            postgresql_ops={"topic": "gin_trgm_ops"},
+        ),
+    )
+    # Fetch server-generated columns via INSERT/UPDATE ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -34,8 +67,7 @@ class UserGeneratedQuestion(Base):
         Boolean, default=False, nullable=False
     )  # Public questions can be attempted by anyone
 
-    # Questions stored as JSONB array
-    questions = Column(JSONB, nullable=False, default=[])
+    # Questions are stored one row each in user_generated_question_items
     total_questions = Column(Integer, nullable=False, default=0)
 
     # Question categorization (aggregated from questions)
@@ -76,17 +108,100 @@ class UserGeneratedQuestion(Base):
         back_populates="question_set",
         cascade="all, delete-orphan",
     )
+    items = relationship(
+        "UserGeneratedQuestionItem",
+        back_populates="question_set",
+        order_by="UserGeneratedQuestionItem.idx",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @property
+    def questions(self):
+        """Questions of the set as a list of dicts, in order"""
+        return [item.data for item in self.items]
 
     class Config:
         from_attributes = True
 
 
+class UserGeneratedQuestionItem(Base):
+    """
+    A single question of a user generated question set.
+    Kept in its own row so edits, deletes and appends touch only the
+    affected questions instead of rewriting the whole set.
+    """
+
+    __tablename__ = "user_generated_question_items"
+    __table_args__ = (
+        # Deferred so shifting indexes after a delete can't collide mid-statement
+        UniqueConstraint(
+            "question_set_id",
+            "idx",
+            name="uq_ugq_items_question_set_idx",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    question_set_id = Column(
+        Integer,
+        ForeignKey("user_generated_questions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    idx = Column(Integer, nullable=False)  # Position within the set (0-based)
+    question_hash = Column(
+        LargeBinary(16), ForeignKey("question_bank.hash"), nullable=False
+    )
+
+    # Relationships
+    question_set = relationship("UserGeneratedQuestion", back_populates="items")
+    entry = relationship("QuestionBank", lazy="joined")
+
+    @property
+    def data(self):
+        """The question body shared through the question bank"""
+        return self.entry.data
+
+
+class QuestionBank(Base):
+    """
+    Canonical question bodies, stored once and shared by every set that
+    contains an identical question (hash-consing)
+    """
+
+    __tablename__ = "question_bank"
+
+    hash = Column(LargeBinary(16), primary_key=True)  # BLAKE2b of canonical JSON
+    data = Column(JSONB, nullable=False)
+
+    @staticmethod
+    def hash_question(question: dict) -> bytes:
+        """Content hash of a question, independent of key order"""
+        canonical = json.dumps(
+            question, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
 class UserGeneratedQuestionAttempt(Base):
     """
     Track attempts on user-generated questions
     """
 
     __tablename__ = "user_generated_question_attempts"
+    __table_args__ = (
+        Index("ix_ugqa_uid_qsid_ic", "user_id", "question_set_id", "is_completed"),
+        # Pending-attempt probes only ever look at incomplete rows
+        Index(
+            "ix_ugqa_pending",
+            "user_id",
+            "question_set_id",
+            postgresql_where=text("is_completed = false"),
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     question_set_id = Column(
@@ -94,10 +209,7 @@ class UserGeneratedQuestionAttempt(Base):
     )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
-    # Attempt results
-    answers = Column(
-        JSONB, nullable=True, default=[]
-    )  # User's answers with correctness
+    # Attempt results (answers are rows in user_generated_question_answers)
     score = Column(Integer, nullable=True)  # Percentage score
     correct_answers = Column(Integer, nullable=True)
     total_questions = Column(Integer, nullable=False)
@@ -115,17 +227,58 @@ class UserGeneratedQuestionAttempt(Base):
     # Relationships
     question_set = relationship("UserGeneratedQuestion", back_populates="attempts")
     user = relationship("User", backref="question_attempts")
+    answer_rows = relationship(
+        "UserGeneratedQuestionAnswer",
+        order_by="UserGeneratedQuestionAnswer.question_index",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @property
+    def answers(self):
+        """User's answers with correctness, as a list of dicts"""
+        return [
+            {
+                "question_index": row.question_index,
+                "selected_answer": row.selected_answer,
+                "correct_answer": row.correct_answer,
+                "is_correct": row.is_correct,
+            }
+            for row in self.answer_rows
+        ]
 
     class Config:
         from_attributes = True
 
 
+class UserGeneratedQuestionAnswer(Base):
+    """
+    A single answer submitted in a user's attempt, one row per question
+    """
+
+    __tablename__ = "user_generated_question_answers"
+
+    id = Column(Integer, primary_key=True)
+    attempt_id = Column(
+        Integer,
+        ForeignKey("user_generated_question_attempts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    question_index = Column(Integer, nullable=False)
+    # Answers can be an option index, a boolean or free text depending on type
+    selected_answer = Column(JSONB, nullable=True)
+    correct_answer = Column(JSONB, nullable=True)
+    is_correct = Column(Boolean, nullable=False)
+
+
 class GuestQuestionAttempt(Base):
     """
     Track guest attempts on user-generated questions (users without accounts)
     """
 
     __tablename__ = "guest_question_attempts"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     question_set_id = Column(
@@ -1,22 +1,342 @@
 # app/services/user_generated_question.py
+import asyncio
+import hashlib
+import json
+import logging
 import math
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import and_, desc, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    desc,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.models.user import User
 from app.models.user_generated_question import (
+    GuestQuestionAttempt,
+    QuestionBank,
     UserGeneratedQuestion,
+    UserGeneratedQuestionAnswer,
     UserGeneratedQuestionAttempt,
+    UserGeneratedQuestionItem,
 )
 from app.utils.ai import ai_service
+from app.utils.file_upload import InMemoryUploadFile, file_upload_service
+
+logger = logging.getLogger(__name__)
+
+# Per-user Redis hashes (question_set_id -> value) used by the public listing
+# An empty value means "known to have none", a missing field means "not cached"
+# and a best score prefixed with "~" is only a lower bound (also "not cached")
+BEST_SCORE_CACHE_KEY = "ugq:best:{user_id}"
+PENDING_ATTEMPT_CACHE_KEY = "ugq:pending:{user_id}"
+ATTEMPT_STATUS_CACHE_TTL = 24 * 60 * 60  # 1 day
+
+# Fold a submitted score into the cached best and clear the pending marker in
+# one atomic step, so concurrent submissions can't overwrite a higher score.
+# An unknown previous best keeps the score as a lower bound for the next
+# listing to merge with the database value.
+# KEYS: best hash, pending hash; ARGV: question_set_id, score, ttl
+_RECORD_COMPLETED_ATTEMPT_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+local score = tonumber(ARGV[2])
+if not previous or string.sub(previous, 1, 1) == '~' then
+    local bound = previous and tonumber(string.sub(previous, 2))
+    if not bound or bound < score then
+        redis.call('HSET', KEYS[1], ARGV[1], '~' .. ARGV[2])
+    end
+elseif previous == '' or tonumber(previous) < score then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call('HSET', KEYS[2], ARGV[1], '')
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+# Warm the cache from statuses read out of the database without clobbering
+# anything a submit or start wrote after that read: the best score only ever
+# rises and a pending marker is only set where none is cached.
+# KEYS: best hash, pending hash; ARGV: ttl, then question_set_id, best score,
+# pending marker for each set
+_WARM_ATTEMPT_STATUS_SCRIPT = """
+for i = 2, #ARGV, 3 do
+    local best = ARGV[i + 1]
+    local cached = redis.call('HGET', KEYS[1], ARGV[i])
+    if cached then
+        local known = (string.gsub(cached, '^~', ''))
+        if known ~= '' and (best == '' or tonumber(best) < tonumber(known)) then
+            best = known
+        end
+    end
+    redis.call('HSET', KEYS[1], ARGV[i], best)
+    redis.call('HSETNX', KEYS[2], ARGV[i], ARGV[i + 2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Exact-match cache of first-time topic generations (when AI_CACHE_ENABLED)
+AI_GENERATION_CACHE_KEY = "ai:q:{digest}"
+AI_GENERATION_CACHE_TTL = 24 * 60 * 60  # 1 day
+
+# Topic generations above this many questions are split into concurrent calls
+AI_GENERATION_CHUNK_SIZE = 10
+
+
+def _normalize_question_text(text: str) -> str:
+    """Question text compared for repeats, ignoring case and whitespace"""
+    return " ".join(text.casefold().split())
 
 
 class UserGeneratedQuestionService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _paginate(
+        self, query, page: int, size: int, single_entity: bool = True
+    ) -> Tuple[list, dict]:
+        """
+        Fetch one page of an already ordered query together with the total
+        row count, using COUNT(*) OVER () so both come back in one round-trip.
+        With single_entity=False the full rows are returned instead of just
+        their first column.
+        """
+        offset = (page - 1) * size
+        rows = (
+            query.add_columns(func.count().over().label("_total"))
+            .offset(offset)
+            .limit(size)
+            .all()
+        )
+
+        if rows:
+            total = rows[0]._total
+        elif offset > 0:
+            # Page past the end: the window has no rows to report on
+            total = query.order_by(None).count()
+        else:
+            total = 0
+
+        pagination = {
+            "total": total,
+            "page": page,
+            "size": size,
+            "total_pages": math.ceil(total / size) if size > 0 else 0,
+        }
+
+        if single_entity:
+            rows = [row[0] for row in rows]
+        return rows, pagination
+
+    def _get_owned_set(
+        self, question_set_id: int, user_id: int, for_update: bool = False
+    ) -> UserGeneratedQuestion:
+        """
+        Get a question set owned by the user, optionally locking its row
+        for the rest of the transaction
+        """
+        query = self.db.query(UserGeneratedQuestion).filter(
+            UserGeneratedQuestion.id == question_set_id,
+            UserGeneratedQuestion.user_id == user_id,
+        )
+        if for_update:
+            query = query.with_for_update()
+
+        question_set = query.first()
+
+        if not question_set:
+            raise HTTPException(
+                status_code=404,
+                detail="Question set not found",
+            )
+
+        return question_set
+
+    def _store_questions(self, questions: List[dict]) -> List[bytes]:
+        """
+        Add question bodies to the shared question bank, skipping ones that
+        are already there, and return their hashes in the given order
+        """
+        hashes = [QuestionBank.hash_question(q) for q in questions]
+        pending = dict(zip(hashes, questions))
+        while pending:
+            self.db.execute(
+                pg_insert(QuestionBank)
+                .values([{"hash": h, "data": q} for h, q in pending.items()])
+                .on_conflict_do_nothing(index_elements=[QuestionBank.hash])
+            )
+            # Lock the bodies until commit so a concurrent orphan cleanup
+            # can't delete them before our items reference them; any it
+            # removed in between are inserted again
+            locked = set(
+                self.db.scalars(
+                    select(QuestionBank.hash)
+                    .where(QuestionBank.hash.in_(list(pending)))
+                    .with_for_update(key_share=True)
+                )
+            )
+            pending = {h: q for h, q in pending.items() if h not in locked}
+        return hashes
+
+    def _delete_orphaned_questions(self, question_hashes) -> None:
+        """
+        Remove question bank bodies that no set references any more
+        """
+        if not question_hashes:
+            return
+
+        try:
+            # A savepoint, so losing a race with a set that just started
+            # using one of these bodies only skips the cleanup
+            with self.db.begin_nested():
+                self.db.execute(
+                    delete(QuestionBank)
+                    .where(
+                        QuestionBank.hash.in_(list(set(question_hashes))),
+                        ~exists().where(
+                            UserGeneratedQuestionItem.question_hash
+                            == QuestionBank.hash
+                        ),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+        except IntegrityError:
+            logger.info("Skipped question bank cleanup; bodies are still in use")
+
+    def _insert_question_items(
+        self, question_set_id: int, questions: List[dict], start_idx: int = 0
+    ) -> None:
+        """
+        Insert questions as rows of a set in a single multi-row INSERT
+        """
+        hashes = self._store_questions(questions)
+        self.db.execute(
+            insert(UserGeneratedQuestionItem),
+            [
+                {
+                    "question_set_id": question_set_id,
+                    "idx": start_idx + offset,
+                    "question_hash": question_hash,
+                }
+                for offset, question_hash in enumerate(hashes)
+            ],
+        )
+
+    def _save_new_question_set(
+        self, question_set: UserGeneratedQuestion, questions: List[dict]
+    ) -> UserGeneratedQuestion:
+        """
+        Insert a new question set with its questions and commit
+        """
+        self.db.add(question_set)
+        self.db.flush()
+        self._insert_question_items(question_set.id, questions)
+        self._commit_without_reload()
+
+        return question_set
+
+    def _drop_repeated_questions(
+        self, new_questions: List[dict], previous_questions: List[str]
+    ) -> List[dict]:
+        """
+        Drop generated questions whose text repeats an earlier question,
+        ignoring case and whitespace
+        """
+        seen = {_normalize_question_text(q) for q in previous_questions if q}
+        unique_questions = []
+        for question in new_questions:
+            text = _normalize_question_text(question.get("question") or "")
+            if text:
+                if text in seen:
+                    continue
+                seen.add(text)
+            unique_questions.append(question)
+
+        if len(unique_questions) < len(new_questions):
+            logger.info(
+                f"Dropped {len(new_questions) - len(unique_questions)} repeated generated questions"
+            )
+        return unique_questions
+
+    def _append_questions(
+        self, question_set: UserGeneratedQuestion, new_questions: List[dict]
+    ) -> UserGeneratedQuestion:
+        """
+        Append generated questions to an existing set and commit
+        """
+        # Lock and reload the set only now, not across the AI call, so a
+        # concurrent append or delete can't shift the indexes under us
+        self.db.refresh(question_set, with_for_update=True)
+
+        # Read the existing questions before inserting; refresh() expired the
+        # items, so a load after the INSERT would already include the new rows
+        all_questions = question_set.questions + new_questions
+
+        # Append new questions as new rows after the existing ones
+        self._insert_question_items(
+            question_set.id, new_questions, start_idx=question_set.total_questions
+        )
+        # Increment server-side rather than writing back a Python-side count
+        question_set.total_questions = UserGeneratedQuestion.total_questions + len(
+            new_questions
+        )
+
+        # Update primary category and cognitive level based on all questions
+        all_categories = [
+            q.get("question_category")
+            for q in all_questions
+            if q.get("question_category")
+        ]
+        all_cognitive_levels = [
+            q.get("cognitive_level") for q in all_questions if q.get("cognitive_level")
+        ]
+
+        question_set.question_category = (
+            max(set(all_categories), key=all_categories.count)
+            if all_categories
+            else None
+        )
+        question_set.cognitive_level = (
+            max(set(all_cognitive_levels), key=all_cognitive_levels.count)
+            if all_cognitive_levels
+            else None
+        )
+
+        self.db.commit()
+        self.db.refresh(question_set)
+
+        return question_set
+
+    def _commit_without_reload(self) -> None:
+        """
+        Commit but keep already loaded attributes. These models use
+        eager_defaults, so server-generated columns come back with the
+        INSERT/UPDATE and a refresh() afterwards would only re-read them.
+        """
+        expire_on_commit = self.db.expire_on_commit
+        self.db.expire_on_commit = False
+        try:
+            self.db.commit()
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+
     async def generate_questions_from_topic(
         self,
         user_id: int,
@@ -32,15 +352,30 @@ class UserGeneratedQuestionService:
         """
         Generate questions from topic using AI and save to database
         """
-        # Generate questions using AI
-        result = await ai_service.generate_questions(
-            topic=topic,
-            difficulty=difficulty,
-            count=count,
-            question_type=question_type,
-            notes=notes,
-            previous_questions=None,  # First generation, no previous questions
-        )
+        # Generate questions using AI, reusing an identical earlier generation.
+        # The AI layer never caches these sampled calls itself, so this is
+        # the only cache they go through.
+        cache_key = None
+        result = None
+        if settings.ai_cache_enabled:
+            cache_key = AI_GENERATION_CACHE_KEY.format(
+                digest=hashlib.blake2b(
+                    f"{topic}|{difficulty}|{question_type}|{notes}|{count}".encode(),
+                    digest_size=16,
+                ).hexdigest()
+            )
+            result = self._read_generation_cache(cache_key)
+        if result is None:
+            result = await self._generate_topic_questions(
+                topic=topic,
+                difficulty=difficulty,
+                count=count,
+                question_type=question_type,
+                notes=notes,
+                previous_questions=None,  # First generation, no previous questions
+            )
+            if cache_key and result.get("questions"):
+                self._write_generation_cache(cache_key, result)
 
         questions = result.get("questions", [])
 
@@ -79,18 +414,88 @@ class UserGeneratedQuestionService:
             difficulty=difficulty,
             question_type=question_type,
             is_public=is_public,
-            questions=questions,
             total_questions=len(questions),
             source_type="topic",
             question_category=primary_category,
             cognitive_level=primary_cognitive_level,
         )
 
-        self.db.add(question_set)
-        self.db.commit()
-        self.db.refresh(question_set)
+        # Persist in a worker thread so the commit doesn't block the event loop
+        return await asyncio.to_thread(
+            self._save_new_question_set, question_set, questions
+        )
 
-        return question_set
+    def _read_generation_cache(self, cache_key: str) -> Optional[dict]:
+        """
+        Return a cached AI generation result, or None on miss or cache error
+        """
+        try:
+            cached = get_redis_client().get(cache_key)
+        except Exception as e:
+            logger.warning(f"AI generation cache read failed: {e}")
+            return None
+        return json.loads(cached) if cached else None
+
+    def _write_generation_cache(self, cache_key: str, result: dict) -> None:
+        """
+        Store an AI generation result for identical future requests
+        """
+        try:
+            get_redis_client().set(
+                cache_key, json.dumps(result), ex=AI_GENERATION_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"AI generation cache write failed: {e}")
+
+    async def _generate_topic_questions(
+        self,
+        topic: str,
+        difficulty: str,
+        count: int,
+        question_type: str,
+        notes: Optional[str],
+        previous_questions: Optional[List[str]],
+    ) -> dict:
+        """
+        Generate questions from a topic, splitting large counts into
+        concurrent AI calls and merging the results without duplicates
+        """
+        chunk_count = math.ceil(count / AI_GENERATION_CHUNK_SIZE)
+        chunk_sizes = [
+            count // chunk_count + (1 if i < count % chunk_count else 0)
+            for i in range(chunk_count)
+        ]
+
+        # Concurrency is bounded by the AI client's own request limit
+        results = await asyncio.gather(
+            *(
+                ai_service.generate_questions(
+                    topic=topic,
+                    difficulty=difficulty,
+                    count=chunk_size,
+                    question_type=question_type,
+                    notes=notes,
+                    previous_questions=previous_questions,
+                )
+                for chunk_size in chunk_sizes
+            )
+        )
+
+        if len(results) == 1:
+            return results[0]
+
+        # Chunks can't see each other's output, so drop repeated questions
+        seen = set()
+        questions = []
+        for result in results:
+            for question in result.get("questions", []):
+                key = _normalize_question_text(str(question.get("question", "")))
+                if key in seen:
+                    continue
+                seen.add(key)
+                questions.append(question)
+
+        return {"questions": questions}
 
     async def generate_questions_from_pdf(
         self,
@@ -115,17 +520,15 @@ class UserGeneratedQuestionService:
                 detail="File must be a PDF",
             )
 
-        # Save PDF file to server with UUID naming
-        from app.utils.file_upload import file_upload_service
-
-        uuid_filename, relative_path = await file_upload_service.save_file(
-            file=file, folder="user_questions", allowed_extensions=[".pdf"]
-        )
+        # Read the upload once so the AI can work from memory while the
+        # original is written to storage
+        pdf_file = InMemoryUploadFile(await file.read(), file.filename)
+        await file.seek(0)
 
         # Generate questions using AI
         if use_images:
-            result = await ai_service.generate_questions_with_images_from_pdf(
-                file=file,
+            generation = ai_service.generate_questions_with_images_from_pdf(
+                file=pdf_file,
                 difficulty=difficulty,
                 total_count=count,  # Note: argument name is different in image generator
                 question_type=question_type,
@@ -134,8 +537,8 @@ class UserGeneratedQuestionService:
                 image_percentage=0.2,  # allocate 20% for images
             )
         else:
-            result = await ai_service.generate_questions_from_pdf(
-                file=file,
+            generation = ai_service.generate_questions_from_pdf(
+                file=pdf_file,
                 difficulty=difficulty,
                 count=count,
                 question_type=question_type,
@@ -143,6 +546,14 @@ class UserGeneratedQuestionService:
                 previous_questions=None,  # First generation
             )
 
+        # Save PDF file to server with UUID naming, overlapping the generation
+        (uuid_filename, relative_path), result = await asyncio.gather(
+            file_upload_service.save_file(
+                file=file, folder="user_questions", allowed_extensions=[".pdf"]
+            ),
+            generation,
+        )
+
         questions = result.get("questions", [])
 
         if not questions:
@@ -183,7 +594,6 @@ class UserGeneratedQuestionService:
             difficulty=difficulty,
             question_type=question_type,
             is_public=is_public,
-            questions=questions,
             total_questions=len(questions),
             source_type="pdf",
             source_file_name=uuid_filename,  # Store UUID filename
@@ -191,11 +601,10 @@ class UserGeneratedQuestionService:
             cognitive_level=primary_cognitive_level,
         )
 
-        self.db.add(question_set)
-        self.db.commit()
-        self.db.refresh(question_set)
-
-        return question_set
+        # Persist in a worker thread so the commit doesn't block the event loop
+        return await asyncio.to_thread(
+            self._save_new_question_set, question_set, questions
+        )
 
     async def add_more_questions(
         self,
@@ -209,27 +618,14 @@ class UserGeneratedQuestionService:
         Add more questions to existing set, AI will avoid duplicates
         """
         # Get existing question set
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
-        )
-
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
-            )
+        question_set = self._get_owned_set(question_set_id, user_id)
 
         # Extract previous question texts
         previous_questions = [q.get("question", "") for q in question_set.questions]
 
         # Generate new questions using AI (with previous questions to avoid duplicates)
         if question_set.source_type == "topic":
-            result = await ai_service.generate_questions(
+            result = await self._generate_topic_questions(
                 topic=question_set.topic,
                 difficulty=question_set.difficulty,
                 count=count,
@@ -241,44 +637,12 @@ class UserGeneratedQuestionService:
             # For PDF-based, check if we have the saved PDF file
             if question_set.source_file_name:
                 # Read the saved PDF file
-                from app.utils.file_upload import file_upload_service
-
-                pdf_path = file_upload_service.get_absolute_path(
+                pdf_content = await file_upload_service.read_file(
                     f"user_questions/{question_set.source_file_name}"
                 )
 
-                if pdf_path and pdf_path.exists():
-                    # Read PDF content
-                    with open(pdf_path, "rb") as f:
-                        pdf_content = f.read()
-
-                    # Create a file-like object with filename attribute
-                    from io import BytesIO
-
-                    class PDFFileWrapper:
-                        def __init__(self, content, filename):
-                            self._content = BytesIO(content)
-                            self.filename = filename
-
-                        async def read(self, size=-1):
-                            # Since BytesIO operations are synchronous, we need to run them in a thread
-                            import asyncio
-
-                            loop = asyncio.get_event_loop()
-                            return await loop.run_in_executor(
-                                None, self._content.read, size
-                            )
-
-                        def seek(self, pos, whence=0):
-                            return self._content.seek(pos, whence)
-
-                        def tell(self):
-                            return self._content.tell()
-
-                        def close(self):
-                            return self._content.close()
-
-                    pdf_file_like = PDFFileWrapper(
+                if pdf_content is not None:
+                    pdf_file_like = InMemoryUploadFile(
                         pdf_content, question_set.source_file_name
                     )
 
@@ -304,7 +668,7 @@ class UserGeneratedQuestionService:
                         )
                 else:
                     # PDF file not found, fall back to topic-based generation
-                    result = await ai_service.generate_questions(
+                    result = await self._generate_topic_questions(
                         topic=question_set.topic,
                         difficulty=question_set.difficulty,
                         count=count,
@@ -314,7 +678,7 @@ class UserGeneratedQuestionService:
                     )
             else:
                 # No saved PDF file, fall back to topic-based generation
-                result = await ai_service.generate_questions(
+                result = await self._generate_topic_questions(
                     topic=question_set.topic,
                     difficulty=question_set.difficulty,
                     count=count,
@@ -323,7 +687,11 @@ class UserGeneratedQuestionService:
                     previous_questions=previous_questions,
                 )
 
-        new_questions = result.get("questions", [])
+        # The prompt asks for new questions, but the model still repeats
+        # some occasionally; don't store those twice
+        new_questions = self._drop_repeated_questions(
+            result.get("questions", []), previous_questions
+        )
 
         if not new_questions:
             raise HTTPException(
@@ -331,44 +699,11 @@ class UserGeneratedQuestionService:
                 detail="Failed to generate additional questions",
             )
 
-        # Append new questions to existing ones
-        current_questions = question_set.questions or []
-        question_set.questions = current_questions + new_questions
-        question_set.total_questions = len(question_set.questions)
-
-        # Update primary category and cognitive level based on all questions
-        all_categories = [
-            q.get("question_category")
-            for q in question_set.questions
-            if q.get("question_category")
-        ]
-        all_cognitive_levels = [
-            q.get("cognitive_level")
-            for q in question_set.questions
-            if q.get("cognitive_level")
-        ]
-
-        question_set.question_category = (
-            max(set(all_categories), key=all_categories.count)
-            if all_categories
-            else None
-        )
-        question_set.cognitive_level = (
-            max(set(all_cognitive_levels), key=all_cognitive_levels.count)
-            if all_cognitive_levels
-            else None
+        # Persist in a worker thread so the commit doesn't block the event loop
+        return await asyncio.to_thread(
+            self._append_questions, question_set, new_questions
         )
 
-        # Mark the questions field as modified for SQLAlchemy
-        from sqlalchemy.orm import attributes
-
-        attributes.flag_modified(question_set, "questions")
-
-        self.db.commit()
-        self.db.refresh(question_set)
-
-        return question_set
-
     def edit_question(
         self,
         question_set_id: int,
@@ -380,41 +715,45 @@ class UserGeneratedQuestionService:
         Edit a specific question in a question set
         """
         # Get existing question set
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
+        question_set = self._get_owned_set(
+            question_set_id, user_id, for_update=True
         )
 
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
-            )
-
         # Check if question index is valid
-        if question_index < 0 or question_index >= len(question_set.questions):
+        if question_index < 0 or question_index >= question_set.total_questions:
             raise HTTPException(
                 status_code=400,
-                detail=f"Question index {question_index} is out of range. Valid range: 0-{len(question_set.questions)-1}",
+                detail=f"Question index {question_index} is out of range. Valid range: 0-{question_set.total_questions-1}",
             )
 
-        # Update the question
-        question_set.questions[question_index] = question_data
+        # Load the questions before the UPDATE below changes what a lazy
+        # load would return
+        all_questions = question_set.questions
+        all_questions[question_index] = question_data
+        old_hash = question_set.items[question_index].question_hash
+
+        # Point the question row at the edited body
+        new_hash = self._store_questions([question_data])[0]
+        self.db.execute(
+            update(UserGeneratedQuestionItem)
+            .where(
+                UserGeneratedQuestionItem.question_set_id == question_set.id,
+                UserGeneratedQuestionItem.idx == question_index,
+            )
+            .values(question_hash=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        if old_hash != new_hash:
+            self._delete_orphaned_questions([old_hash])
 
         # Update primary category and cognitive level
         all_categories = [
             q.get("question_category")
-            for q in question_set.questions
+            for q in all_questions
             if q.get("question_category")
         ]
         all_cognitive_levels = [
-            q.get("cognitive_level")
-            for q in question_set.questions
-            if q.get("cognitive_level")
+            q.get("cognitive_level") for q in all_questions if q.get("cognitive_level")
         ]
 
         question_set.question_category = (
@@ -428,11 +767,6 @@ class UserGeneratedQuestionService:
             else None
         )
 
-        # Mark the questions field as modified for SQLAlchemy
-        from sqlalchemy.orm import attributes
-
-        attributes.flag_modified(question_set, "questions")
-
         self.db.commit()
         self.db.refresh(question_set)
 
@@ -448,51 +782,61 @@ class UserGeneratedQuestionService:
         Delete a specific question from a question set
         """
         # Get existing question set
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
+        question_set = self._get_owned_set(
+            question_set_id, user_id, for_update=True
         )
 
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
-            )
-
         # Check if question index is valid
-        if question_index < 0 or question_index >= len(question_set.questions):
+        if question_index < 0 or question_index >= question_set.total_questions:
             raise HTTPException(
                 status_code=400,
-                detail=f"Question index {question_index} is out of range. Valid range: 0-{len(question_set.questions)-1}",
+                detail=f"Question index {question_index} is out of range. Valid range: 0-{question_set.total_questions-1}",
             )
 
         # Check if this would leave the question set empty
-        if len(question_set.questions) <= 1:
+        if question_set.total_questions <= 1:
             raise HTTPException(
                 status_code=400,
                 detail="Cannot delete the last question from a question set",
             )
 
-        # Delete the question
-        question_set.questions.pop(question_index)
+        # Load the questions before the DML below; a lazy load afterwards
+        # would already see the row gone
+        all_questions = question_set.questions
+        all_questions.pop(question_index)
+
+        # Delete the question row and close the gap in the indexes
+        deleted_hashes = self.db.scalars(
+            delete(UserGeneratedQuestionItem)
+            .where(
+                UserGeneratedQuestionItem.question_set_id == question_set.id,
+                UserGeneratedQuestionItem.idx == question_index,
+            )
+            .returning(UserGeneratedQuestionItem.question_hash)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.execute(
+            update(UserGeneratedQuestionItem)
+            .where(
+                UserGeneratedQuestionItem.question_set_id == question_set.id,
+                UserGeneratedQuestionItem.idx > question_index,
+            )
+            .values(idx=UserGeneratedQuestionItem.idx - 1)
+            .execution_options(synchronize_session=False)
+        )
+        self._delete_orphaned_questions(deleted_hashes)
 
         # Update total questions count
-        question_set.total_questions = len(question_set.questions)
+        question_set.total_questions = len(all_questions)
 
         # Update primary category and cognitive level
         all_categories = [
             q.get("question_category")
-            for q in question_set.questions
+            for q in all_questions
             if q.get("question_category")
         ]
         all_cognitive_levels = [
-            q.get("cognitive_level")
-            for q in question_set.questions
-            if q.get("cognitive_level")
+            q.get("cognitive_level") for q in all_questions if q.get("cognitive_level")
         ]
 
         question_set.question_category = (
@@ -506,11 +850,6 @@ class UserGeneratedQuestionService:
             else None
         )
 
-        # Mark the questions field as modified for SQLAlchemy
-        from sqlalchemy.orm import attributes
-
-        attributes.flag_modified(question_set, "questions")
-
         self.db.commit()
         self.db.refresh(question_set)
 
@@ -525,29 +864,13 @@ class UserGeneratedQuestionService:
         """
         Get all question sets created by user with pagination
         """
-        query = self.db.query(UserGeneratedQuestion).filter(
-            UserGeneratedQuestion.user_id == user_id
-        )
-
-        total = query.count()
-        total_pages = math.ceil(total / size) if size > 0 else 0
-
-        offset = (page - 1) * size
-        question_sets = (
-            query.order_by(desc(UserGeneratedQuestion.created_at))
-            .offset(offset)
-            .limit(size)
-            .all()
+        query = (
+            self.db.query(UserGeneratedQuestion)
+            .filter(UserGeneratedQuestion.user_id == user_id)
+            .order_by(desc(UserGeneratedQuestion.created_at))
         )
 
-        pagination = {
-            "total": total,
-            "page": page,
-            "size": size,
-            "total_pages": total_pages,
-        }
-
-        return question_sets, pagination
+        return self._paginate(query, page, size)
 
     def get_question_set_detail(
         self,
@@ -557,22 +880,7 @@ class UserGeneratedQuestionService:
         """
         Get detailed question set (only creator can see all details)
         """
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
-        )
-
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
-            )
-
-        return question_set
+        return self._get_owned_set(question_set_id, user_id)
 
     def get_public_question_set_detail(
         self,
@@ -608,20 +916,7 @@ class UserGeneratedQuestionService:
         """
         Update question set metadata
         """
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
-        )
-
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
-            )
+        question_set = self._get_owned_set(question_set_id, user_id)
 
         if title is not None:
             question_set.title = title
@@ -643,22 +938,16 @@ class UserGeneratedQuestionService:
         """
         Delete question set (only creator can delete)
         """
-        question_set = (
-            self.db.query(UserGeneratedQuestion)
-            .filter(
-                UserGeneratedQuestion.id == question_set_id,
-                UserGeneratedQuestion.user_id == user_id,
-            )
-            .first()
-        )
-
-        if not question_set:
-            raise HTTPException(
-                status_code=404,
-                detail="Question set not found",
+        question_set = self._get_owned_set(question_set_id, user_id)
+        question_hashes = self.db.scalars(
+            select(UserGeneratedQuestionItem.question_hash).where(
+                UserGeneratedQuestionItem.question_set_id == question_set.id
             )
+        ).all()
 
         self.db.delete(question_set)
+        self.db.flush()
+        self._delete_orphaned_questions(question_hashes)
         self.db.commit()
 
     # ==================== Public Questions ====================
@@ -691,81 +980,46 @@ class UserGeneratedQuestionService:
                 )
             )
 
-        total = query.count()
-        total_pages = math.ceil(total / size) if size > 0 else 0
-
-        offset = (page - 1) * size
-        question_sets = (
-            query.order_by(desc(UserGeneratedQuestion.created_at))
-            .offset(offset)
-            .limit(size)
-            .all()
+        # Page and count the filtered sets before attempt stats are looked up,
+        # so the total reflects the filter only
+        question_sets, pagination = self._paginate(
+            query.order_by(desc(UserGeneratedQuestion.created_at)), page, size
         )
 
+        # Look up the user's attempt status for the whole page at once,
+        # falling back to the database for sets that are not cached yet
+        statuses = {}
+        if current_user_id is not None:
+            question_set_ids = [qs.id for qs in question_sets]
+            statuses = self._read_attempt_status_cache(
+                current_user_id, question_set_ids
+            )
+            missing = self._load_attempt_statuses(
+                current_user_id,
+                [qs_id for qs_id in question_set_ids if qs_id not in statuses],
+            )
+            self._write_attempt_status_cache(current_user_id, missing)
+            statuses.update(missing)
+
         # Build response with attempt status
         result = []
         for qs in question_sets:
-            user_has_attempted = False
-            user_best_score = None
-            user_has_pending_attempt = False
-            pending_attempt_id = None
-            pending_attempt_started_at = None
-
-            if current_user_id is not None:
-                # Check if user has completed attempts
-                user_attempts = (
-                    self.db.query(UserGeneratedQuestionAttempt)
-                    .filter(
-                        UserGeneratedQuestionAttempt.question_set_id == qs.id,
-                        UserGeneratedQuestionAttempt.user_id == current_user_id,
-                        UserGeneratedQuestionAttempt.is_completed == True,
-                    )
-                    .all()
-                )
-
-                user_has_attempted = len(user_attempts) > 0
-                user_best_score = (
-                    max([a.score for a in user_attempts if a.score is not None])
-                    if user_attempts
-                    else None
-                )
-
-                # Check for pending (incomplete) attempt
-                pending_attempt = (
-                    self.db.query(UserGeneratedQuestionAttempt)
-                    .filter(
-                        UserGeneratedQuestionAttempt.question_set_id == qs.id,
-                        UserGeneratedQuestionAttempt.user_id == current_user_id,
-                        UserGeneratedQuestionAttempt.is_completed == False,
-                    )
-                    .first()
-                )
-
-                user_has_pending_attempt = pending_attempt is not None
-                pending_attempt_id = pending_attempt.id if pending_attempt else None
-                pending_attempt_started_at = (
-                    pending_attempt.started_at if pending_attempt else None
-                )
+            user_best_score, pending_attempt_id, pending_attempt_started_at = (
+                statuses.get(qs.id, (None, None, None))
+            )
 
             result.append(
                 {
                     "question_set": qs,
-                    "user_has_attempted": user_has_attempted,
+                    "user_has_attempted": user_best_score is not None,
                     "user_best_score": user_best_score,
-                    "user_has_pending_attempt": user_has_pending_attempt,
+                    "user_has_pending_attempt": pending_attempt_id is not None,
                     "pending_attempt_id": pending_attempt_id,
                     "pending_attempt_started_at": pending_attempt_started_at,
                     "creator_name": qs.user.display_name if qs.user else "Unknown",
                 }
             )
 
-        pagination = {
-            "total": total,
-            "page": page,
-            "size": size,
-            "total_pages": total_pages,
-        }
-
         return result, pagination
 
     def get_question_set_participants(
@@ -778,8 +1032,6 @@ class UserGeneratedQuestionService:
         Get all participants who attempted a question set with their best scores.
         Returns leaderboard sorted by best score with pagination.
         """
-        from sqlalchemy import func
-
         # Get question set
         question_set = (
             self.db.query(UserGeneratedQuestion)
@@ -800,94 +1052,265 @@ class UserGeneratedQuestionService:
                 detail="This question set is private",
             )
 
-        # Get aggregated best score per user first
-        from app.models.user import User
-
-        subq_best = (
+        # Per completed attempt, attach the user's best score, attempt count
+        # and latest completion. NULL time_taken is treated as a large value
+        # so untimed attempts rank worse.
+        attempt_user = UserGeneratedQuestionAttempt.user_id
+        per_attempt = (
             self.db.query(
-                UserGeneratedQuestionAttempt.user_id.label("user_id"),
-                func.max(UserGeneratedQuestionAttempt.score).label("best_score"),
+                attempt_user.label("user_id"),
+                UserGeneratedQuestionAttempt.score.label("score"),
+                func.coalesce(UserGeneratedQuestionAttempt.time_taken, 999999).label(
+                    "time_taken"
+                ),
+                func.max(UserGeneratedQuestionAttempt.score)
+                .over(partition_by=attempt_user)
+                .label("best_score"),
+                func.count()
+                .over(partition_by=attempt_user)
+                .label("total_attempts"),
+                func.max(UserGeneratedQuestionAttempt.completed_at)
+                .over(partition_by=attempt_user)
+                .label("last_attempt_at"),
             )
             .filter(
                 UserGeneratedQuestionAttempt.question_set_id == question_set_id,
                 UserGeneratedQuestionAttempt.is_completed == True,
             )
-            .group_by(UserGeneratedQuestionAttempt.user_id)
             .subquery()
         )
 
-        # For each user, get total attempts and the fastest time among attempts with best_score
-        # Use COALESCE to treat NULL time_taken as large value so they rank worse
-        coalesced_time = func.coalesce(UserGeneratedQuestionAttempt.time_taken, 999999)
-
-        attempts_agg = (
+        # One row per user: fastest time among their best-score attempts,
+        # ranked in SQL so ties share a rank regardless of page size
+        best_time = func.min(per_attempt.c.time_taken)
+        ranking = (per_attempt.c.best_score.desc(), best_time.asc())
+        leaderboard = (
             self.db.query(
-                subq_best.c.user_id,
-                subq_best.c.best_score,
-                func.count(UserGeneratedQuestionAttempt.id).label("total_attempts"),
-                func.min(coalesced_time).label("best_time"),
-                func.max(UserGeneratedQuestionAttempt.completed_at).label(
-                    "last_attempt_at"
-                ),
+                User,
+                per_attempt.c.best_score,
+                per_attempt.c.total_attempts,
+                per_attempt.c.last_attempt_at,
+                best_time.label("best_time"),
+                func.rank().over(order_by=ranking).label("rank"),
             )
-            .join(
-                UserGeneratedQuestionAttempt,
-                UserGeneratedQuestionAttempt.user_id == subq_best.c.user_id,
+            .join(User, User.id == per_attempt.c.user_id)
+            .filter(per_attempt.c.score == per_attempt.c.best_score)
+            .group_by(
+                User.id,
+                per_attempt.c.best_score,
+                per_attempt.c.total_attempts,
+                per_attempt.c.last_attempt_at,
             )
-            .filter(
-                UserGeneratedQuestionAttempt.question_set_id == question_set_id,
-                UserGeneratedQuestionAttempt.is_completed == True,
-                UserGeneratedQuestionAttempt.score == subq_best.c.best_score,
-            )
-            .group_by(subq_best.c.user_id, subq_best.c.best_score)
-            .order_by(subq_best.c.best_score.desc(), func.min(coalesced_time).asc())
+            .order_by(*ranking, User.id)
         )
 
-        # Get total count before pagination
-        total_participants = attempts_agg.count()
-        total_pages = math.ceil(total_participants / size) if size > 0 else 0
-
-        # Apply pagination
-        offset = (page - 1) * size
-        attempts_paginated = attempts_agg.offset(offset).limit(size).all()
-
-        # Build participant list with user info and rankings
-        participants = []
-        rank = (page - 1) * size + 1
-        for attempt in attempts_paginated:
-            user = self.db.query(User).filter(User.id == attempt.user_id).first()
-
-            if user:
-                participants.append(
-                    {
-                        "user_id": user.id,
-                        "user_name": user.display_name,
-                        "profile_picture": user.profile_picture,
-                        "best_score": int(attempt.best_score or 0),
-                        "total_attempts": int(attempt.total_attempts or 0),
-                        "best_time": (
-                            int(attempt.best_time)
-                            if attempt.best_time is not None
-                            and attempt.best_time != 999999
-                            else None
-                        ),
-                        "last_attempt_at": attempt.last_attempt_at,
-                        "rank": rank,
-                    }
-                )
-                rank += 1
+        rows, pagination = self._paginate(leaderboard, page, size, single_entity=False)
+
+        participants = [
+            {
+                "user_id": row.User.id,
+                "user_name": row.User.display_name,
+                "profile_picture": row.User.profile_picture,
+                "best_score": int(row.best_score or 0),
+                "total_attempts": int(row.total_attempts or 0),
+                "best_time": (
+                    int(row.best_time)
+                    if row.best_time is not None and row.best_time != 999999
+                    else None
+                ),
+                "last_attempt_at": row.last_attempt_at,
+                "rank": row.rank,
+            }
+            for row in rows
+        ]
 
         return {
             "participants": participants,
-            "total_participants": total_participants,
+            "total_participants": pagination["total"],
             "question_set_id": question_set.id,
             "question_set_title": question_set.title,
             "total_attempts": question_set.attempt_count,
             "page": page,
             "size": size,
-            "total_pages": total_pages,
+            "total_pages": pagination["total_pages"],
         }
 
+    # ==================== Attempt Status Cache ====================
+
+    def _read_attempt_status_cache(
+        self, user_id: int, question_set_ids: List[int]
+    ) -> Dict[int, tuple]:
+        """
+        Read cached (best_score, pending_attempt_id, pending_started_at)
+        for the given question sets. Sets missing from the cache are omitted.
+        """
+        if not question_set_ids:
+            return {}
+
+        try:
+            pipe = get_redis_client().pipeline()
+            pipe.hmget(BEST_SCORE_CACHE_KEY.format(user_id=user_id), question_set_ids)
+            pipe.hmget(
+                PENDING_ATTEMPT_CACHE_KEY.format(user_id=user_id), question_set_ids
+            )
+            best_values, pending_values = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Attempt status cache read failed: {e}")
+            return {}
+
+        cached = {}
+        for qs_id, best, pending in zip(question_set_ids, best_values, pending_values):
+            if best is None or pending is None or best.startswith(b"~"):
+                continue
+
+            best_score = int(best) if best else None
+            pending_id, pending_started_at = None, None
+            if pending:
+                raw_id, raw_started_at = pending.decode().split("|", 1)
+                pending_id = int(raw_id)
+                pending_started_at = datetime.fromisoformat(raw_started_at)
+
+            cached[qs_id] = (best_score, pending_id, pending_started_at)
+
+        return cached
+
+    def _write_attempt_status_cache(
+        self, user_id: int, statuses: Dict[int, tuple]
+    ) -> None:
+        """
+        Store (best_score, pending_attempt_id, pending_started_at) per question
+        set as read from the database. A submit or start that lands after that
+        read has already updated the cache and is kept.
+        """
+        if not statuses:
+            return
+
+        args = []
+        for qs_id, (best_score, pending_id, pending_started_at) in statuses.items():
+            args.extend(
+                (
+                    qs_id,
+                    "" if best_score is None else best_score,
+                    (
+                        f"{pending_id}|{pending_started_at.isoformat()}"
+                        if pending_id is not None
+                        else ""
+                    ),
+                )
+            )
+
+        try:
+            get_redis_client().eval(
+                _WARM_ATTEMPT_STATUS_SCRIPT,
+                2,
+                BEST_SCORE_CACHE_KEY.format(user_id=user_id),
+                PENDING_ATTEMPT_CACHE_KEY.format(user_id=user_id),
+                ATTEMPT_STATUS_CACHE_TTL,
+                *args,
+            )
+        except Exception as e:
+            logger.warning(f"Attempt status cache write failed: {e}")
+
+    def _cache_pending_attempt(self, attempt: UserGeneratedQuestionAttempt) -> None:
+        """
+        Record a newly started attempt as the user's pending one for its set
+        """
+        pending_key = PENDING_ATTEMPT_CACHE_KEY.format(user_id=attempt.user_id)
+        try:
+            pipe = get_redis_client().pipeline()
+            pipe.hset(
+                pending_key,
+                attempt.question_set_id,
+                f"{attempt.id}|{attempt.started_at.isoformat()}",
+            )
+            pipe.expire(pending_key, ATTEMPT_STATUS_CACHE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Attempt status cache write failed: {e}")
+
+    def _cache_completed_attempt(self, attempt: UserGeneratedQuestionAttempt) -> None:
+        """
+        Fold a submitted attempt's score into the cached best score and clear
+        the pending marker. If the previous best is unknown, the score is kept
+        as a lower bound that the next listing merges with the database.
+        """
+        try:
+            get_redis_client().eval(
+                _RECORD_COMPLETED_ATTEMPT_SCRIPT,
+                2,
+                BEST_SCORE_CACHE_KEY.format(user_id=attempt.user_id),
+                PENDING_ATTEMPT_CACHE_KEY.format(user_id=attempt.user_id),
+                attempt.question_set_id,
+                attempt.score,
+                ATTEMPT_STATUS_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Attempt status cache write failed: {e}")
+
+    def _load_attempt_statuses(
+        self, user_id: int, question_set_ids: List[int]
+    ) -> Dict[int, tuple]:
+        """
+        Load (best_score, pending_attempt_id, pending_started_at) per question
+        set from the database
+        """
+        if not question_set_ids:
+            return {}
+
+        # Best completed score per set, aggregated in SQL
+        best_scores = dict(
+            self.db.query(
+                UserGeneratedQuestionAttempt.question_set_id,
+                func.max(
+                    case(
+                        (
+                            UserGeneratedQuestionAttempt.is_completed == True,
+                            UserGeneratedQuestionAttempt.score,
+                        )
+                    )
+                ),
+            )
+            .filter(
+                UserGeneratedQuestionAttempt.question_set_id.in_(question_set_ids),
+                UserGeneratedQuestionAttempt.user_id == user_id,
+            )
+            .group_by(UserGeneratedQuestionAttempt.question_set_id)
+            .all()
+        )
+
+        # One pending (incomplete) attempt per set, fetched as plain rows
+        pending_attempts = {
+            row.question_set_id: row
+            for row in self.db.execute(
+                select(
+                    UserGeneratedQuestionAttempt.question_set_id,
+                    UserGeneratedQuestionAttempt.id,
+                    UserGeneratedQuestionAttempt.started_at,
+                )
+                .where(
+                    UserGeneratedQuestionAttempt.question_set_id.in_(question_set_ids),
+                    UserGeneratedQuestionAttempt.user_id == user_id,
+                    UserGeneratedQuestionAttempt.is_completed == False,
+                )
+                .distinct(UserGeneratedQuestionAttempt.question_set_id)
+                .order_by(
+                    UserGeneratedQuestionAttempt.question_set_id,
+                    UserGeneratedQuestionAttempt.id,
+                )
+            )
+        }
+
+        statuses = {}
+        for qs_id in question_set_ids:
+            pending_attempt = pending_attempts.get(qs_id)
+            statuses[qs_id] = (
+                best_scores.get(qs_id),
+                pending_attempt.id if pending_attempt else None,
+                pending_attempt.started_at if pending_attempt else None,
+            )
+
+        return statuses
+
     # ==================== Attempts ====================
 
     def start_attempt(
@@ -943,8 +1366,9 @@ class UserGeneratedQuestionService:
         )
 
         self.db.add(attempt)
-        self.db.commit()
-        self.db.refresh(attempt)
+        self._commit_without_reload()
+
+        self._cache_pending_attempt(attempt)
 
         return attempt, question_set
 
@@ -958,11 +1382,14 @@ class UserGeneratedQuestionService:
         """
         Submit attempt and calculate score
         """
-        from datetime import datetime
-
-        # Get attempt
+        # Get attempt together with its question set in one query
         attempt = (
             self.db.query(UserGeneratedQuestionAttempt)
+            .options(
+                joinedload(UserGeneratedQuestionAttempt.question_set).selectinload(
+                    UserGeneratedQuestion.items
+                )
+            )
             .filter(
                 UserGeneratedQuestionAttempt.id == attempt_id,
                 UserGeneratedQuestionAttempt.user_id == user_id,
@@ -980,30 +1407,21 @@ class UserGeneratedQuestionService:
         # Get question set
         question_set = attempt.question_set
 
-        # Calculate results
-        correct_count = 0
-        processed_answers = []
-
-        for answer in answers:
-            question_idx = answer.get("question_index", 0)
-            selected_answer = answer.get("selected_answer")
-
-            if question_idx < len(question_set.questions):
-                question = question_set.questions[question_idx]
-                correct_answer = question.get("correct_answer")
-                is_correct = selected_answer == correct_answer
-
-                if is_correct:
-                    correct_count += 1
-
-                processed_answers.append(
-                    {
-                        "question_index": question_idx,
-                        "selected_answer": selected_answer,
-                        "correct_answer": correct_answer,
-                        "is_correct": is_correct,
-                    }
-                )
+        # Calculate results against a precomputed answer key
+        answer_key = {
+            i: q.get("correct_answer") for i, q in enumerate(question_set.questions)
+        }
+        processed_answers = [
+            {
+                "question_index": question_idx,
+                "selected_answer": answer.get("selected_answer"),
+                "correct_answer": answer_key[question_idx],
+                "is_correct": answer.get("selected_answer") == answer_key[question_idx],
+            }
+            for answer in answers
+            if (question_idx := answer.get("question_index", 0)) in answer_key
+        ]
+        correct_count = sum(a["is_correct"] for a in processed_answers)
 
         # Calculate score
         score = (
@@ -1012,8 +1430,12 @@ class UserGeneratedQuestionService:
             else 0
         )
 
-        # Update attempt
-        attempt.answers = processed_answers
+        # Store the answers in one batched INSERT, then update the aggregates
+        if processed_answers:
+            self.db.execute(
+                insert(UserGeneratedQuestionAnswer),
+                [{"attempt_id": attempt.id, **answer} for answer in processed_answers],
+            )
         attempt.score = score
         attempt.correct_answers = correct_count
         attempt.time_taken = time_taken
@@ -1023,8 +1445,9 @@ class UserGeneratedQuestionService:
         # Update question set attempt count
         question_set.attempt_count += 1
 
-        self.db.commit()
-        self.db.refresh(attempt)
+        self._commit_without_reload()
+
+        self._cache_completed_attempt(attempt)
 
         return attempt
 
@@ -1037,30 +1460,16 @@ class UserGeneratedQuestionService:
         """
         Get all attempts by user with pagination
         """
-        query = self.db.query(UserGeneratedQuestionAttempt).filter(
-            UserGeneratedQuestionAttempt.user_id == user_id,
-            UserGeneratedQuestionAttempt.is_completed == True,
-        )
-
-        total = query.count()
-        total_pages = math.ceil(total / size) if size > 0 else 0
-
-        offset = (page - 1) * size
-        attempts = (
-            query.order_by(desc(UserGeneratedQuestionAttempt.completed_at))
-            .offset(offset)
-            .limit(size)
-            .all()
+        query = (
+            self.db.query(UserGeneratedQuestionAttempt)
+            .filter(
+                UserGeneratedQuestionAttempt.user_id == user_id,
+                UserGeneratedQuestionAttempt.is_completed == True,
+            )
+            .order_by(desc(UserGeneratedQuestionAttempt.completed_at))
         )
 
-        pagination = {
-            "total": total,
-            "page": page,
-            "size": size,
-            "total_pages": total_pages,
-        }
-
-        return attempts, pagination
+        return self._paginate(query, page, size)
 
     def get_attempt_detail(
         self,
@@ -1113,14 +1522,11 @@ class UserGeneratedQuestionService:
         question_set_id: int,
         phone_number: str,
         guest_name: Optional[str] = None,
-    ) -> Tuple["GuestQuestionAttempt", UserGeneratedQuestion]:
+    ) -> Tuple[GuestQuestionAttempt, UserGeneratedQuestion]:
         """
         Start a guest attempt on a question set
         """
         # Check if phone number exists in users table
-        from app.models.user import User
-        from app.models.user_generated_question import GuestQuestionAttempt
-
         existing_user = (
             self.db.query(User).filter(User.phone_number == phone_number).first()
         )
@@ -1156,8 +1562,7 @@ class UserGeneratedQuestionService:
         )
 
         self.db.add(attempt)
-        self.db.commit()
-        self.db.refresh(attempt)
+        self._commit_without_reload()
 
         return attempt, question_set
 
@@ -1167,15 +1572,14 @@ class UserGeneratedQuestionService:
         phone_number: str,
         answers: List[dict],
         time_taken: int,
-    ) -> "GuestQuestionAttempt":
+    ) -> GuestQuestionAttempt:
         """
         Submit answers for a guest attempt (can be partial/incomplete)
         """
-        from app.models.user_generated_question import GuestQuestionAttempt
-
-        # Get attempt
+        # Get attempt together with its question set in one query
         attempt = (
             self.db.query(GuestQuestionAttempt)
+            .options(joinedload(GuestQuestionAttempt.question_set))
             .filter(
                 GuestQuestionAttempt.id == attempt_id,
                 GuestQuestionAttempt.phone_number == phone_number,
@@ -1195,8 +1599,10 @@ class UserGeneratedQuestionService:
                 detail="Attempt already completed",
             )
 
-        # Get question set to validate answers
+        # Get question set to validate answers; read its questions once, the
+        # property rebuilds the list from the items on every access
         question_set = attempt.question_set
+        questions = question_set.questions
 
         # Process answers and calculate score
         processed_answers = []
@@ -1209,8 +1615,8 @@ class UserGeneratedQuestionService:
             if question_index is None:
                 continue
 
-            if 0 <= question_index < len(question_set.questions):
-                question = question_set.questions[question_index]
+            if 0 <= question_index < len(questions):
+                question = questions[question_index]
                 correct_answer = question.get("correct_answer")
 
                 if selected_answer is not None:
@@ -1268,12 +1674,10 @@ class UserGeneratedQuestionService:
         self,
         attempt_id: int,
         phone_number: str,
-    ) -> "GuestQuestionAttempt":
+    ) -> GuestQuestionAttempt:
         """
         Get detailed guest attempt result
         """
-        from app.models.user_generated_question import GuestQuestionAttempt
-
         attempt = (
             self.db.query(GuestQuestionAttempt)
             .filter(
@@ -1296,32 +1700,14 @@ class UserGeneratedQuestionService:
         phone_number: str,
         page: int = 1,
         size: int = 20,
-    ) -> Tuple[List["GuestQuestionAttempt"], dict]:
+    ) -> Tuple[List[GuestQuestionAttempt], dict]:
         """
         Get all guest attempts by phone number
         """
-        from app.models.user_generated_question import GuestQuestionAttempt
-
-        query = self.db.query(GuestQuestionAttempt).filter(
-            GuestQuestionAttempt.phone_number == phone_number
-        )
-
-        total = query.count()
-        total_pages = math.ceil(total / size) if size > 0 else 0
-
-        offset = (page - 1) * size
-        attempts = (
-            query.order_by(desc(GuestQuestionAttempt.started_at))
-            .offset(offset)
-            .limit(size)
-            .all()
+        query = (
+            self.db.query(GuestQuestionAttempt)
+            .filter(GuestQuestionAttempt.phone_number == phone_number)
+            .order_by(desc(GuestQuestionAttempt.started_at))
         )
 
-        pagination = {
-            "total": total,
-            "page": page,
-            "size": size,
-            "total_pages": total_pages,
-        }
-
-        return attempts, pagination
+        return self._paginate(query, page, size)
@@ -1,15 +1,29 @@
-import json
+import asyncio
+import hashlib
 import logging
-import re
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+import orjson
 from fastapi import HTTPException
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAioHttpClient
+from openai.types.chat import ChatCompletion
 
+from app.core.cache import get_redis_client
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on AI response text we are willing to scan for JSON
+MAX_RESPONSE_CHARS = 1_000_000
+
+# Requests to the AI API in flight at once from this process (for streams,
+# until the response starts); extra callers queue here instead of piling
+# onto the provider
+_ai_request_semaphore = asyncio.Semaphore(settings.ai_max_concurrent)
+
+# Completions of cacheable requests are reused for settings.ai_cache_ttl
+COMPLETION_CACHE_KEY = "ai:completion:{digest}"
+
 
 class BaseAIService:
     """Base Service to interact with DeepSeek AI API"""
@@ -29,7 +43,13 @@ class BaseAIService:
                 else None
             ),
             timeout=900.0,  # 15 minutes timeout for long-running requests
-            max_retries=2,  # Automatic retry on transient failures
+            # Retries 408/409/429/5xx and connection errors with exponential
+            # backoff and jitter, honouring Retry-After
+            max_retries=settings.ai_max_retries,
+            # One pooled aiohttp-backed client for the whole process; it holds
+            # up better than the httpx transport under many concurrent calls
+            # and keeps idle connections alive between generations
+            http_client=DefaultAioHttpClient(),
         )
 
         # Validate configuration
@@ -48,6 +68,72 @@ class BaseAIService:
         """Check if AI service is properly configured"""
         return bool(self.api_key and self.api_endpoint and self.model)
 
+    def _completion_cache_key(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool,
+    ) -> str:
+        """
+        Build the Redis key for a completion request
+
+        Whitespace in the prompt is collapsed first, so the same text pasted
+        with different spacing or line breaks hits the same cache entry.
+        """
+        normalized_prompt = " ".join(prompt.split())
+        payload = orjson.dumps(
+            [
+                self.model,
+                system_message,
+                normalized_prompt,
+                temperature,
+                max_tokens,
+                json_mode,
+            ]
+        )
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return COMPLETION_CACHE_KEY.format(digest=digest)
+
+    def _read_text_cache(self, cache_key: str) -> Optional[str]:
+        """Return cached text, or None on miss or cache error"""
+        try:
+            cached = get_redis_client().get(cache_key)
+        except Exception as e:
+            logger.warning(f"AI cache read failed for {cache_key}: {e}")
+            return None
+        return cached.decode() if cached else None
+
+    def _write_text_cache(self, cache_key: str, value: str, ttl: int) -> None:
+        """Store text for identical future requests"""
+        try:
+            get_redis_client().set(cache_key, value, ex=ttl)
+        except Exception as e:
+            logger.warning(f"AI cache write failed for {cache_key}: {e}")
+
+    def _extract_completion(self, response: ChatCompletion) -> str:
+        """
+        Return the text of the first choice in a completion response
+
+        Raises:
+            HTTPException: If the response has no message
+        """
+        if not response.choices:
+            logger.error(f"AI response has no choices: {response}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to parse AI response. Model: {self.model}, Error: response has no choices",
+            )
+        message = response.choices[0].message
+
+        # Thinking models return their reasoning separately from the answer
+        reasoning = getattr(message, "reasoning_content", None)
+        if reasoning:
+            logger.debug(f"Model reasoning: {reasoning[:500]}...")
+
+        return message.content.strip() if message.content else ""
+
     def _extract_json_from_response(self, text: str) -> Any:
         """
         Extract and parse JSON from AI response that may contain markdown formatting
@@ -61,23 +147,41 @@ class BaseAIService:
         Raises:
             HTTPException: If JSON parsing fails
         """
+        if len(text) > MAX_RESPONSE_CHARS:
+            logger.error(f"AI response too large to parse: {len(text)} characters")
+            raise HTTPException(
+                status_code=500, detail="AI response was too large to process"
+            )
+
+        # Fast path: the model usually returns bare JSON as instructed,
+        # so try parsing it directly before searching for a code block
+        stripped = text.strip()
+        if stripped.startswith(("{", "[")):
+            try:
+                return orjson.loads(stripped)
+            except orjson.JSONDecodeError:
+                pass
+
         try:
             # Remove markdown code block markers if present
-            # Pattern matches ```json\n{...}\n``` or ```\n{...}\n```
-            json_pattern = r"```(?:json)?\s*\n?([\s\S]*?)\n?```"
-            match = re.search(json_pattern, text)
-
-            if match:
+            # Handles ```json\n{...}\n``` and ```\n{...}\n```; the closing
+            # fence is the last one so backticks inside the JSON are kept
+            _, _, tail = text.partition("```")
+            if tail.startswith("json"):
+                tail = tail[4:]
+            body, fence, _ = tail.rpartition("```")
+
+            if fence:
                 # Extract JSON from code block
-                json_text = match.group(1).strip()
+                json_text = body.strip()
             else:
                 # No code block, try to parse the whole text
                 json_text = text.strip()
 
             # Parse the JSON
-            return json.loads(json_text)
+            return orjson.loads(json_text)
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from AI response: {str(e)}")
             logger.error(f"Response length: {len(text)} characters")
             logger.error(f"Full response: {text}")
@@ -101,7 +205,7 @@ class BaseAIService:
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
-    ) -> Dict:
+    ) -> ChatCompletion:
         """
         Make a request to DeepSeek AI API with thinking model support
 
@@ -111,7 +215,7 @@ class BaseAIService:
             max_tokens: Maximum tokens in response
 
         Returns:
-            API response dictionary
+            API response object
 
         Raises:
             HTTPException: If API request fails
@@ -127,26 +231,19 @@ class BaseAIService:
 
         try:
             # Use OpenAI SDK which has built-in retry, timeout, and connection management
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-
-            # Convert to dict for backward compatibility
-            response_data = response.model_dump()
+            async with _ai_request_semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
 
             # Log response structure for debugging
             if is_thinking_model:
                 logger.info(f"Using thinking model: {self.model}")
-                if "choices" in response_data and len(response_data["choices"]) > 0:
-                    message_keys = list(
-                        response_data["choices"][0].get("message", {}).keys()
-                    )
-                    logger.info(f"Response message keys: {message_keys}")
 
-            return response_data
+            return response
 
         except Exception as e:
             error_msg = str(e)
@@ -175,6 +272,8 @@ class BaseAIService:
         system_message: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        cacheable: bool = False,
     ) -> str:
         """
         Generate a text completion from AI with thinking model support
@@ -184,51 +283,80 @@ class BaseAIService:
             system_message: Optional system message to set context
             temperature: Controls randomness (0.0 to 2.0)
             max_tokens: Maximum tokens in response
+            json_mode: Ask the provider to return a single JSON object
+            cacheable: Reuse the answer for identical requests when the AI
+                cache is enabled; leave off for generations that are meant
+                to differ between identical requests
 
         Returns:
             Generated text response
         """
-        messages = []
-
-        if system_message:
-            messages.append({"role": "system", "content": system_message})
+        cache_key = None
+        if cacheable and settings.ai_cache_enabled:
+            cache_key = self._completion_cache_key(
+                prompt, system_message, temperature, max_tokens, json_mode
+            )
+            cached = self._read_text_cache(cache_key)
+            if cached is not None:
+                return cached
+
+        # Read the completion as a stream so long generations arrive
+        # incrementally instead of in one response held until the end
+        chunks = [
+            chunk
+            async for chunk in self.stream_completion(
+                prompt,
+                system_message=system_message,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                json_mode=json_mode,
+            )
+        ]
+        completion = "".join(chunks).strip()
 
-        messages.append({"role": "user", "content": prompt})
+        if cache_key and completion:
+            self._write_text_cache(cache_key, completion, settings.ai_cache_ttl)
+        return completion
 
-        response = await self._make_request(
-            messages=messages, temperature=temperature, max_tokens=max_tokens
-        )
+    async def stream_completion(
+        self,
+        prompt: str,
+        system_message: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a text completion from AI
 
-        # Check if using thinking model
-        is_thinking_model = "reasoner" in self.model.lower()
+        Args:
+            prompt: The user prompt/question
+            system_message: Optional system message to set context
+            temperature: Controls randomness (0.0 to 2.0)
+            max_tokens: Maximum tokens in response
+            json_mode: Ask the provider to return a single JSON object
 
-        try:
-            message = response["choices"][0]["message"]
+        Yields:
+            Chunks of the generated text
 
-            # For thinking models, handle reasoning_content separately
-            if is_thinking_model and "reasoning_content" in message:
-                # reasoning_content contains the internal thought process
-                reasoning = message.get("reasoning_content", "")
-                # The actual response is still in content
-                completion = message.get("content", "")
+        Raises:
+            HTTPException: If the response is cut off at max_tokens
+        """
+        messages = []
 
-                # Optionally log reasoning for debugging
-                if reasoning:
-                    logger.debug(f"Model reasoning: {reasoning[:500]}...")
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
 
-                return completion.strip() if completion else ""
-            else:
-                # Standard model response
-                completion = message["content"]
-                return completion.strip()
+        messages.append({"role": "user", "content": prompt})
 
-        except (KeyError, IndexError) as e:
-            logger.error(f"Failed to parse AI response: {str(e)}")
-            logger.error(f"Response structure: {response}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to parse AI response. Model: {self.model}, Error: {str(e)}",
-            )
+        async for chunk in self.chat_stream(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+            fail_on_truncation=True,
+        ):
+            yield chunk
 
     async def chat(
         self,
@@ -252,36 +380,15 @@ class BaseAIService:
             messages=messages, temperature=temperature, max_tokens=max_tokens
         )
 
-        is_thinking_model = "reasoner" in self.model.lower()
-
-        try:
-            message = response["choices"][0]["message"]
-
-            if is_thinking_model and "reasoning_content" in message:
-                reasoning = message.get("reasoning_content", "")
-                completion = message.get("content", "")
-
-                if reasoning:
-                    logger.debug(f"Model reasoning: {reasoning[:500]}...")
-
-                return completion.strip() if completion else ""
-            else:
-                completion = message["content"]
-                return completion.strip()
-
-        except (KeyError, IndexError) as e:
-            logger.error(f"Failed to parse AI response: {str(e)}")
-            logger.error(f"Response structure: {response}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to parse AI response. Model: {self.model}, Error: {str(e)}",
-            )
+        return self._extract_completion(response)
 
     async def chat_stream(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        fail_on_truncation: bool = False,
     ):
         """
         Stream a multi-turn conversation with AI (generator for SSE)
@@ -290,6 +397,10 @@ class BaseAIService:
             messages: List of message dicts with 'role' and 'content'
             temperature: Controls randomness (0.0 to 2.0)
             max_tokens: Maximum tokens in response
+            json_mode: Ask the provider to return a single JSON object
+            fail_on_truncation: Raise instead of ending quietly when the
+                response is cut off at max_tokens; chat replies keep the
+                partial text, generated JSON is useless without its end
 
         Yields:
             Chunks of the AI's response message
@@ -300,15 +411,25 @@ class BaseAIService:
                 detail="AI service is not configured. Please check API key and endpoint.",
             )
 
+        # JSON mode returns a bare JSON object with no markdown around it;
+        # thinking models do not support it
+        request_options = {}
+        if json_mode and "reasoner" not in self.model.lower():
+            request_options["response_format"] = {"type": "json_object"}
+
         try:
-            # Create streaming completion
-            stream = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=True,
-            )
+            # Hold a slot only while the request is being opened; streams
+            # (e.g. SSE tutoring chats) can stay open for as long as the
+            # client is connected and must not starve other AI work
+            async with _ai_request_semaphore:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **request_options,
+                )
 
             # Stream chunks
             async for chunk in stream:
@@ -316,7 +437,21 @@ class BaseAIService:
                     delta = chunk.choices[0].delta
                     if delta.content:
                         yield delta.content
-
+                    # The provider reports truncation directly; no need to
+                    # reparse the accumulated text to find out
+                    if chunk.choices[0].finish_reason == "length":
+                        logger.warning(
+                            f"AI response stopped at max_tokens={max_tokens} "
+                            "and is likely incomplete"
+                        )
+                        if fail_on_truncation:
+                            raise HTTPException(
+                                status_code=500,
+                                detail="AI response was incomplete. Please try again with fewer questions or increase timeout.",
+                            )
+
+        except HTTPException:
+            raise
         except Exception as e:
             error_msg = str(e)
             logger.error(f"AI streaming error: {error_msg}")
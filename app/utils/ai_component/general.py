@@ -13,6 +13,7 @@ from app.utils.prompts import (
     get_multiple_choice_prompt,
     get_notes_context,
     get_previous_questions_context,
+    get_question_distribution,
     get_summarize_prompt,
     get_summarize_system_message,
     get_topic_explanation_prompt,
@@ -22,6 +23,13 @@ from app.utils.prompts import (
 
 logger = logging.getLogger(__name__)
 
+QUESTION_PROMPT_BUILDERS = {
+    "multiple_choice": get_multiple_choice_prompt,
+    "true_false": get_true_false_prompt,
+    "essay": get_essay_prompt,
+    "mixed": get_mixed_prompt,
+}
+
 
 class GeneralGeneratorMixin:
     async def generate_questions(
@@ -47,12 +55,32 @@ class GeneralGeneratorMixin:
         Returns:
             Dictionary with parsed questions
         """
+        prompt = self._build_questions_prompt(
+            topic, difficulty, count, question_type, notes, previous_questions
+        )
+
+        response_text = await self.generate_completion(
+            prompt=prompt,
+            system_message=ENHANCED_SYSTEM_MESSAGE,
+            temperature=0.85,  # Slightly lower for more consistency
+            max_tokens=8000,
+            json_mode=True,
+        )
+
+        return self._extract_json_from_response(response_text)
+
+    def _build_questions_prompt(
+        self,
+        topic: str,
+        difficulty: str,
+        count: int,
+        question_type: str,
+        notes: Optional[str],
+        previous_questions: Optional[List[str]],
+    ) -> str:
+        """Build the question generation prompt for a single topic"""
         # Calculate exact distribution
-        standard_count = int(count * 0.7)
-        critical_count = int(count * 0.2)
-        linking_count = max(
-            1, count - standard_count - critical_count
-        )  # Ensure we hit exact count
+        standard_count, critical_count, linking_count = get_question_distribution(count)
 
         # Difficulty guidelines
         current_difficulty_guide = get_difficulty_guide(difficulty)
@@ -63,69 +91,19 @@ class GeneralGeneratorMixin:
         # Build notes context
         notes_context = get_notes_context(notes)
 
-        # Question type specific prompts
-        if question_type == "multiple_choice":
-            prompt = get_multiple_choice_prompt(
-                count,
-                topic,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-            )
-
-        elif question_type == "true_false":
-            prompt = get_true_false_prompt(
-                count,
-                topic,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-            )
-
-        elif question_type == "essay":
-            prompt = get_essay_prompt(
-                count,
-                topic,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-            )
-
-        else:  # mixed
-            mcq_count = int(count * 0.65)
-            tf_count = count - mcq_count
-
-            prompt = get_mixed_prompt(
-                count,
-                topic,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                mcq_count,
-                tf_count,
-                notes_context,
-                previous_context,
-            )
-
-        response_text = await self.generate_completion(
-            prompt=prompt,
-            system_message=ENHANCED_SYSTEM_MESSAGE,
-            temperature=0.85,  # Slightly lower for more consistency
-            max_tokens=8000,
+        # Question type specific prompt; anything else is treated as mixed
+        prompt_builder = QUESTION_PROMPT_BUILDERS.get(question_type, get_mixed_prompt)
+        return prompt_builder(
+            count,
+            topic,
+            current_difficulty_guide,
+            standard_count,
+            critical_count,
+            linking_count,
+            notes_context,
+            previous_context,
         )
 
-        return self._extract_json_from_response(response_text)
-
     async def summarize_content(
         self, content: str, max_length: Optional[int] = None
     ) -> str:
@@ -144,7 +122,10 @@ class GeneralGeneratorMixin:
         prompt = get_summarize_prompt(content, max_length)
 
         return await self.generate_completion(
-            prompt=prompt, system_message=system_message, temperature=0.5
+            prompt=prompt,
+            system_message=system_message,
+            temperature=0.5,
+            cacheable=True,
         )
 
     async def explain_concept(
@@ -166,7 +147,10 @@ class GeneralGeneratorMixin:
         prompt = get_explain_concept_prompt(concept, level)
 
         return await self.generate_completion(
-            prompt=prompt, system_message=system_message, temperature=0.7
+            prompt=prompt,
+            system_message=system_message,
+            temperature=0.7,
+            cacheable=True,
         )
 
     async def explain_topic_content(
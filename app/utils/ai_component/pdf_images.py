@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from io import BytesIO
 from typing import Any, Dict, List, Optional
@@ -21,6 +22,65 @@ logger = logging.getLogger(__name__)
 
 
 class PDFImageGeneratorMixin:
+    async def _generate_image_question(
+        self, img_data: Dict[str, Any], difficulty: str, idx: int, total: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate one question for an extracted image
+
+        Returns:
+            The generated questions, or an empty list if generation failed
+        """
+        try:
+            logger.info(
+                f"Generating question {idx}/{total} for image on page {img_data['page_number']}"
+            )
+
+            prompt = get_image_question_prompt(
+                image_text=img_data["image_text"],
+                page_text=img_data["page_text"],
+                page_number=img_data["page_number"],
+                difficulty=difficulty,
+                count=1,  # One question at a time
+            )
+
+            response_text = await self.generate_completion(
+                prompt=prompt,
+                system_message=get_image_question_system_message(),
+                temperature=0.75,
+                max_tokens=1500,
+            )
+
+            result = self._extract_json_from_response(response_text)
+
+            # Add image to the question (not sent to AI)
+            questions = []
+            if isinstance(result, dict) and "questions" in result:
+                for question in result["questions"]:
+                    question["image"] = img_data["image_base64"]
+                    question["content_page_number"] = img_data["page_number"]
+                    question["question_type"] = "image"
+                    questions.append(question)
+            return questions
+
+        except Exception as e:
+            logger.error(f"Failed to generate image question {idx}: {str(e)}")
+            return []
+
+    async def _generate_image_questions(
+        self, image_data_list: List[Dict[str, Any]], difficulty: str
+    ) -> List[Dict[str, Any]]:
+        """Generate questions for all extracted images, keeping their order"""
+        results = await asyncio.gather(
+            *(
+                self._generate_image_question(
+                    img_data, difficulty, idx, len(image_data_list)
+                )
+                for idx, img_data in enumerate(image_data_list, 1)
+            )
+        )
+        return [question for questions in results for question in questions]
+
     async def generate_questions_from_pdf_images(
         self,
         file: UploadFile,
@@ -727,42 +787,11 @@ class PDFImageGeneratorMixin:
 
             doc.close()
 
-            # Generate questions one by one for each image
-            image_questions = []
-            for idx, img_data in enumerate(image_data_list[:image_count], 1):
-                try:
-                    logger.info(
-                        f"Generating question {idx}/{image_count} for image on page {img_data['page_number']}"
-                    )
-
-                    prompt = get_image_question_prompt(
-                        image_text=img_data["image_text"],
-                        page_text=img_data["page_text"],
-                        page_number=img_data["page_number"],
-                        difficulty=difficulty,
-                        count=1,  # One question at a time
-                    )
-
-                    response_text = await self.generate_completion(
-                        prompt=prompt,
-                        system_message=get_image_question_system_message(),
-                        temperature=0.75,
-                        max_tokens=1500,
-                    )
-
-                    result = self._extract_json_from_response(response_text)
-
-                    # Add image to the question (not sent to AI)
-                    if isinstance(result, dict) and "questions" in result:
-                        for question in result["questions"]:
-                            question["image"] = img_data["image_base64"]
-                            question["content_page_number"] = img_data["page_number"]
-                            question["question_type"] = "image"
-                            image_questions.append(question)
-
-                except Exception as e:
-                    logger.error(f"Failed to generate image question {idx}: {str(e)}")
-                    continue
+            # Image questions are independent; request them concurrently
+            # (the shared AI semaphore still caps in-flight calls)
+            image_questions = await self._generate_image_questions(
+                image_data_list[:image_count], difficulty
+            )
 
             logger.info(
                 f"Successfully generated {len(image_questions)} image questions"
@@ -1011,42 +1040,11 @@ class PDFImageGeneratorMixin:
 
             doc.close()
 
-            # Generate questions one by one for each image
-            image_questions = []
-            for idx, img_data in enumerate(image_data_list[:image_count], 1):
-                try:
-                    logger.info(
-                        f"Generating question {idx}/{image_count} for image on page {img_data['page_number']}"
-                    )
-
-                    prompt = get_image_question_prompt(
-                        image_text=img_data["image_text"],
-                        page_text=img_data["page_text"],
-                        page_number=img_data["page_number"],
-                        difficulty=difficulty,
-                        count=1,  # One question at a time
-                    )
-
-                    response_text = await self.generate_completion(
-                        prompt=prompt,
-                        system_message=get_image_question_system_message(),
-                        temperature=0.75,
-                        max_tokens=1500,
-                    )
-
-                    result = self._extract_json_from_response(response_text)
-
-                    # Add image to the question (not sent to AI)
-                    if isinstance(result, dict) and "questions" in result:
-                        for question in result["questions"]:
-                            question["image"] = img_data["image_base64"]
-                            question["content_page_number"] = img_data["page_number"]
-                            question["question_type"] = "image"
-                            image_questions.append(question)
-
-                except Exception as e:
-                    logger.error(f"Failed to generate image question {idx}: {str(e)}")
-                    continue
+            # Image questions are independent; request them concurrently
+            # (the shared AI semaphore still caps in-flight calls)
+            image_questions = await self._generate_image_questions(
+                image_data_list[:image_count], difficulty
+            )
 
             logger.info(
                 f"Successfully generated {len(image_questions)} image questions"
@@ -19,10 +19,26 @@ from app.utils.prompts import (
     get_pdf_path_true_false_prompt,
     get_pdf_previous_questions_context,
     get_pdf_true_false_prompt,
+    get_question_distribution,
 )
 
 logger = logging.getLogger(__name__)
 
+# Prompt builder per question type; anything else is treated as multiple choice
+PDF_PROMPT_BUILDERS = {
+    "essay": get_pdf_essay_prompt,
+    "mixed": get_pdf_mixed_prompt,
+    "true_false": get_pdf_true_false_prompt,
+    "multiple_choice": get_pdf_mcq_prompt,
+}
+
+PDF_PATH_PROMPT_BUILDERS = {
+    "essay": get_pdf_path_essay_prompt,
+    "mixed": get_pdf_path_mixed_prompt,
+    "true_false": get_pdf_path_true_false_prompt,
+    "multiple_choice": get_pdf_path_mcq_prompt,
+}
+
 
 class PDFQuestionGeneratorMixin:
     async def generate_questions_from_pdf(
@@ -51,18 +67,18 @@ class PDFQuestionGeneratorMixin:
         if not file.filename.lower().endswith(".pdf"):
             raise HTTPException(status_code=400, detail="File must be a PDF")
 
-        pdf_content = await self.extract_text_from_pdf(file)
-
         max_content_length = 8000  # Increased for better context
+        pdf_content = await self.extract_text_from_pdf(
+            file, max_chars=max_content_length
+        )
+
         if len(pdf_content) > max_content_length:
             pdf_content = (
                 pdf_content[:max_content_length] + "\n\n[Content truncated...]"
             )
 
         # Calculate exact distribution
-        standard_count = int(count * 0.7)
-        critical_count = int(count * 0.2)
-        linking_count = max(1, count - standard_count - critical_count)
+        standard_count, critical_count, linking_count = get_question_distribution(count)
 
         # Difficulty guidelines
         current_difficulty_guide = get_pdf_difficulty_guide(difficulty)
@@ -72,68 +88,27 @@ class PDFQuestionGeneratorMixin:
 
         notes_context = get_pdf_notes_context(notes)
 
-        # ==========================================
-        # PROMPT GENERATION BASED ON TYPE
-        # ==========================================
-
-        if question_type == "essay":
-            prompt = get_pdf_essay_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-
-        elif question_type == "mixed":
-            mcq_count = int(count * 0.65)
-            tf_count = count - mcq_count
-
-            prompt = get_pdf_mixed_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                mcq_count,
-                tf_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-
-        elif question_type == "true_false":
-            prompt = get_pdf_true_false_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-
-        else:  # multiple_choice
-            prompt = get_pdf_mcq_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
+        prompt_builder = PDF_PROMPT_BUILDERS.get(question_type, get_pdf_mcq_prompt)
+        prompt = prompt_builder(
+            count,
+            current_difficulty_guide,
+            standard_count,
+            critical_count,
+            linking_count,
+            notes_context,
+            previous_context,
+            pdf_content,
+        )
 
         response_text = await self.generate_completion(
             prompt=prompt,
             system_message=ENHANCED_SYSTEM_MESSAGE,
             temperature=0.7,  # Lower temperature for content fidelity
             max_tokens=8000,
+            json_mode=True,
+            # A first generation for the same PDF text and parameters can be
+            # reused; follow-ups ask for new questions and must not be
+            cacheable=not previous_questions,
         )
 
         return self._extract_json_from_response(response_text)
@@ -162,86 +137,48 @@ class PDFQuestionGeneratorMixin:
         Returns:
             Dictionary with parsed questions
         """
-        # Extract text using the path-based helper
-        pdf_content = await self.extract_text_from_pdf_path(pdf_path)
+        # Extract text using the path-based helper, reading only what fits
+        max_content_length = 8000
+        pdf_content = await self.extract_text_from_pdf_path(
+            pdf_path, max_chars=max_content_length
+        )
 
         # Truncate content if necessary to fit context window
-        max_content_length = 8000
         if len(pdf_content) > max_content_length:
             pdf_content = (
                 pdf_content[:max_content_length] + "\n\n[Content truncated...]"
             )
 
-        # Reuse the logic from generate_questions_from_pdf by calling it?
-        # No, UploadFile is different from string content. We must replicate the prompt logic
-        # or refactor. For safety and speed, we replicate the prompt construction.
-
-        standard_count = int(count * 0.7)
-        critical_count = int(count * 0.2)
-        linking_count = max(1, count - standard_count - critical_count)
+        # Calculate exact distribution
+        standard_count, critical_count, linking_count = get_question_distribution(count)
 
-        difficulty_guide = {
-            "easy": "EASY: Straightforward recall from text.",
-            "medium": "MEDIUM: Understanding and application of text concepts.",
-            "hard": "HARD: Analysis and synthesis of text information.",
-        }
         current_difficulty_guide = get_pdf_path_difficulty_guide(difficulty)
 
         previous_context = get_pdf_path_previous_questions_context(previous_questions)
 
         notes_context = get_pdf_path_notes_context(notes)
 
-        # Select Prompt
-        if question_type == "essay":
-            prompt = get_pdf_path_essay_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-        elif question_type == "true_false":
-            prompt = get_pdf_path_true_false_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-        elif question_type == "mixed":
-            prompt = get_pdf_path_mixed_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
-        else:  # Multiple Choice
-            prompt = get_pdf_path_mcq_prompt(
-                count,
-                current_difficulty_guide,
-                standard_count,
-                critical_count,
-                linking_count,
-                notes_context,
-                previous_context,
-                pdf_content,
-            )
+        prompt_builder = PDF_PATH_PROMPT_BUILDERS.get(
+            question_type, get_pdf_path_mcq_prompt
+        )
+        prompt = prompt_builder(
+            count,
+            current_difficulty_guide,
+            standard_count,
+            critical_count,
+            linking_count,
+            notes_context,
+            previous_context,
+            pdf_content,
+        )
 
         response_text = await self.generate_completion(
             prompt=prompt,
             system_message=ENHANCED_SYSTEM_MESSAGE,
             temperature=0.7,
             max_tokens=8000,
+            json_mode=True,
+            cacheable=not previous_questions,
         )
 
         return self._extract_json_from_response(response_text)
@@ -1,7 +1,12 @@
+import asyncio
+import hashlib
 import logging
+import os
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import fitz  # PyMuPDF
 import pytesseract
@@ -12,35 +17,105 @@ from app.utils.prompts import get_explanation_prompt, get_explanation_system_mes
 
 logger = logging.getLogger(__name__)
 
+# Parallel tesseract processes per document
+OCR_MAX_WORKERS = 4
+
+# Largest PDF accepted for processing, matching the general upload limit
+MAX_PDF_SIZE = 50 * 1024 * 1024
+
+# Extracted text of uploaded PDFs, keyed by a hash of the file bytes.
+# The version segment is bumped whenever extraction changes the text it
+# produces, so entries written by an older release aren't served after deploy
+PDF_TEXT_CACHE_KEY = "ai:pdf_text:v2:{digest}:{max_chars}"
+PDF_TEXT_CACHE_TTL = 24 * 3600
+
+# Extracted text of saved PDFs, keyed by path and file version
+PDF_PATH_TEXT_CACHE_KEY = "ai:pdf_path_text:v2:{path}:{mtime_ns}:{size}:{max_chars}"
+
+
+# Layout whitespace left by PDF text extraction
+_HORIZONTAL_SPACE = re.compile(r"[ \t\xa0]+")
+_LINE_EDGE_SPACE = re.compile(r" ?\n ?")
+_EXTRA_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def compact_page_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines in extracted page text"""
+    text = _HORIZONTAL_SPACE.sub(" ", text)
+    text = _LINE_EDGE_SPACE.sub("\n", text)
+    text = _EXTRA_BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+# A short line on more than half of the pages is a running header/footer
+REPEATED_LINE_MIN_PAGES = 3
+REPEATED_LINE_MAX_LENGTH = 100
+
+
+def drop_repeated_lines(page_texts: List[str]) -> List[str]:
+    """Remove running headers/footers that repeat verbatim across pages"""
+    if len(page_texts) < REPEATED_LINE_MIN_PAGES:
+        return page_texts
+
+    line_pages = Counter(
+        line
+        for text in page_texts
+        for line in set(text.split("\n"))
+        if line and len(line) <= REPEATED_LINE_MAX_LENGTH
+    )
+    repeated = {
+        line for line, count in line_pages.items() if count > len(page_texts) / 2
+    }
+    if not repeated:
+        return page_texts
+
+    cleaned = [
+        compact_page_text(
+            "\n".join(line for line in text.split("\n") if line not in repeated)
+        )
+        for text in page_texts
+    ]
+    # Identical pages throughout; nothing sensible to strip
+    return cleaned if any(cleaned) else page_texts
+
 
 class PDFTextProcessorMixin:
-    async def extract_text_from_pdf(self, file: UploadFile) -> str:
+    def _extract_pdf_pages(
+        self,
+        contents: Optional[bytes] = None,
+        pdf_path: Optional[str] = None,
+        max_chars: Optional[int] = None,
+    ) -> Dict[int, Tuple[str, bool]]:
         """
-        Extract text content from a PDF file with OCR support for image-based PDFs
+        Blocking PyMuPDF/OCR extraction of every page, run in a worker thread
 
         Args:
-            file: Uploaded PDF file
+            contents: Raw PDF bytes
+            pdf_path: Path to the PDF file, used when no bytes are given
+            max_chars: Stop reading further pages once this much text is gathered
 
         Returns:
-            Extracted text content
-
-        Raises:
-            HTTPException: If PDF processing fails
+            Mapping of page number to (text, extracted_with_ocr)
         """
-        try:
-            contents = await file.read()
-            # Open PDF from bytes using PyMuPDF
+        if contents is not None:
             doc = fitz.open(stream=contents, filetype="pdf")
+        else:
+            doc = fitz.open(pdf_path)
 
-            text_content = []
+        with doc:
+            pages: Dict[int, Tuple[str, bool]] = {}
             pages_with_no_text = []
+            total_chars = 0
 
             # First pass: Try to extract text using PyMuPDF
             for page_num, page in enumerate(doc, 1):
+                if max_chars and total_chars >= max_chars:
+                    break
                 try:
-                    text = page.get_text()
-                    if text and text.strip():
-                        text_content.append(f"--- Page {page_num} ---\n{text}")
+                    text = compact_page_text(page.get_text())
+                    if text:
+                        pages[page_num] = (text, False)
+                        total_chars += len(text)
                     else:
                         pages_with_no_text.append(page_num)
                 except Exception as e:
@@ -50,17 +125,10 @@ class PDFTextProcessorMixin:
                     pages_with_no_text.append(page_num)
 
             # Also consider pages with very short text (<5 words) as OCR candidates
-            # Helper to extract word count from a page string
-            def get_page_word_count(page_str: str) -> int:
-                # Extract content after the header line
-                lines = page_str.split("\n", 1)
-                content = lines[1] if len(lines) > 1 else ""
-                return len(content.split())
-
             pages_with_short_text = [
-                int(re.search(r"Page (\d+)", p).group(1))
-                for p in text_content
-                if get_page_word_count(p) < 5
+                page_num
+                for page_num, (text, _) in pages.items()
+                if len(text.split()) < 5
             ]
 
             pages_needing_ocr = sorted(
@@ -71,6 +139,9 @@ class PDFTextProcessorMixin:
             if pages_needing_ocr:
                 logger.info(f"Using OCR for pages: {pages_needing_ocr}")
                 try:
+                    # PyMuPDF is not thread-safe, so pages are rendered here
+                    # one at a time; only the tesseract runs go in parallel
+                    images = {}
                     for page_num in pages_needing_ocr:
                         try:
                             # Load page (0-indexed)
@@ -80,52 +151,125 @@ class PDFTextProcessorMixin:
                                 matrix=fitz.Matrix(2, 2)
                             )  # 2x zoom for better OCR
                             img_data = pix.tobytes("png")
-                            image = Image.open(BytesIO(img_data))
+                            images[page_num] = Image.open(BytesIO(img_data))
+                        except Exception as e:
+                            logger.warning(f"OCR failed for page {page_num}: {str(e)}")
 
-                            # Perform OCR on the image
-                            ocr_text = pytesseract.image_to_string(
-                                image, lang="eng+ara"
+                    # Perform OCR on the images
+                    with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as pool:
+                        ocr_jobs = {
+                            page_num: pool.submit(
+                                pytesseract.image_to_string, image, lang="eng+ara"
                             )
-                            if ocr_text and ocr_text.strip():
-                                ocr_text = ocr_text.strip()
-                                # Prefer OCR if it yields >=5 words
-                                if len(ocr_text.split()) >= 5:
-                                    # Check if we need to replace existing short-text entry
-                                    replaced = False
-                                    for idx, entry in enumerate(text_content):
-                                        match = re.search(r"Page (\d+)", entry)
-                                        if match and int(match.group(1)) == page_num:
-                                            text_content[idx] = (
-                                                f"--- Page {page_num} (OCR) ---\n{ocr_text}"
-                                            )
-                                            replaced = True
-                                            logger.info(
-                                                f"Replaced short text on page {page_num} with OCR content"
-                                            )
-                                            break
-                                    if not replaced:
-                                        text_content.append(
-                                            f"--- Page {page_num} (OCR) ---\n{ocr_text}"
-                                        )
-                                        logger.info(
-                                            f"Successfully extracted OCR text from page {page_num}"
-                                        )
+                            for page_num, image in images.items()
+                        }
+
+                    for page_num, ocr_job in ocr_jobs.items():
+                        try:
+                            ocr_text = ocr_job.result()
                         except Exception as e:
                             logger.warning(f"OCR failed for page {page_num}: {str(e)}")
                             continue
+                        ocr_text = compact_page_text(ocr_text or "")
+                        if ocr_text:
+                            # Prefer OCR text only if it yields substantive content
+                            if len(ocr_text.split()) >= 5:
+                                replaced = page_num in pages
+                                pages[page_num] = (ocr_text, True)
+                                if replaced:
+                                    logger.info(
+                                        f"Replaced short text on page {page_num} with OCR content"
+                                    )
+                                else:
+                                    logger.info(
+                                        f"Successfully extracted OCR text from page {page_num}"
+                                    )
                 except Exception as e:
                     logger.warning(f"Failed to convert PDF to images for OCR: {str(e)}")
 
-            if not text_content:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No text content found in PDF. The file may be empty or OCR failed to extract text.",
-                )
+            return pages
+
+    def _extract_pdf_text(
+        self,
+        contents: Optional[bytes] = None,
+        pdf_path: Optional[str] = None,
+        max_chars: Optional[int] = None,
+    ) -> str:
+        """
+        Blocking PDF text extraction with a "--- Page N ---" header per page
+
+        Raises:
+            HTTPException: If no text could be extracted
+        """
+        pages = self._extract_pdf_pages(contents, pdf_path, max_chars)
+
+        if not pages:
+            raise HTTPException(
+                status_code=400,
+                detail="No text content found in PDF. The file may be empty or OCR failed to extract text.",
+            )
+
+        # Sort by page number to maintain order
+        ordered_pages = sorted(pages.items())
+        page_texts = drop_repeated_lines([text for _, (text, _) in ordered_pages])
+        return "\n\n".join(
+            f"--- Page {page_num}{' (OCR)' if ocr else ''} ---\n{text}"
+            for (page_num, (_, ocr)), text in zip(ordered_pages, page_texts)
+            if text
+        )
 
-            # Sort by page number to maintain order
-            text_content.sort(key=lambda x: int(re.search(r"Page (\d+)", x).group(1)))
+    async def _read_pdf_upload(self, file: UploadFile) -> bytes:
+        """
+        Read an uploaded PDF, refusing oversized files before reading them
+
+        Raises:
+            HTTPException: If the file is larger than MAX_PDF_SIZE
+        """
+        size = getattr(file, "size", None)
+        if size is None or size <= MAX_PDF_SIZE:
+            contents = await file.read(MAX_PDF_SIZE + 1)
+            if len(contents) <= MAX_PDF_SIZE:
+                return contents
+
+        raise HTTPException(
+            status_code=400,
+            detail=f"PDF exceeds maximum allowed size of {MAX_PDF_SIZE // (1024 * 1024)}MB",
+        )
+
+    async def extract_text_from_pdf(
+        self, file: UploadFile, max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Extract text content from a PDF file with OCR support for image-based PDFs
 
-            return "\n\n".join(text_content)
+        Args:
+            file: Uploaded PDF file
+            max_chars: Optional limit; later pages are skipped once it is reached
+
+        Returns:
+            Extracted text content
+
+        Raises:
+            HTTPException: If PDF processing fails
+        """
+        try:
+            contents = await self._read_pdf_upload(file)
+
+            # The same document is often uploaded again; reuse its text
+            cache_key = PDF_TEXT_CACHE_KEY.format(
+                digest=hashlib.blake2b(contents, digest_size=16).hexdigest(),
+                max_chars=max_chars or "all",
+            )
+            cached = self._read_text_cache(cache_key)
+            if cached is not None:
+                return cached
+
+            # PyMuPDF and tesseract are blocking; keep them off the event loop
+            text = await asyncio.to_thread(
+                self._extract_pdf_text, contents, max_chars=max_chars
+            )
+            self._write_text_cache(cache_key, text, PDF_TEXT_CACHE_TTL)
+            return text
 
         except HTTPException:
             raise
@@ -137,12 +281,15 @@ class PDFTextProcessorMixin:
         finally:
             file.seek(0)
 
-    async def extract_text_from_pdf_path(self, pdf_path: str) -> str:
+    async def extract_text_from_pdf_path(
+        self, pdf_path: str, max_chars: Optional[int] = None
+    ) -> str:
         """
         Extract text content from a PDF file path with OCR support for image-based PDFs
 
         Args:
             pdf_path: Path to the PDF file
+            max_chars: Optional limit; later pages are skipped once it is reached
 
         Returns:
             Extracted text content
@@ -151,99 +298,26 @@ class PDFTextProcessorMixin:
             HTTPException: If PDF processing fails
         """
         try:
-            # Open PDF directly from path using PyMuPDF
-            doc = fitz.open(pdf_path)
-
-            text_content = []
-            pages_with_no_text = []
-
-            # First pass: Try to extract text using PyMuPDF
-            for page_num, page in enumerate(doc, 1):
-                try:
-                    text = page.get_text()
-                    if text and text.strip():
-                        text_content.append(f"--- Page {page_num} ---\n{text}")
-                    else:
-                        pages_with_no_text.append(page_num)
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to extract text from page {page_num}: {str(e)}"
-                    )
-                    pages_with_no_text.append(page_num)
-
-            # Also consider pages with very short text (<5 words) as OCR candidates
-            def get_page_word_count(page_str: str) -> int:
-                lines = page_str.split("\n", 1)
-                content = lines[1] if len(lines) > 1 else ""
-                return len(content.split())
-
-            pages_with_short_text = [
-                int(re.search(r"Page (\d+)", p).group(1))
-                for p in text_content
-                if get_page_word_count(p) < 5
-            ]
-
-            pages_needing_ocr = sorted(
-                set(pages_with_no_text) | set(pages_with_short_text)
+            # Saved PDFs are regenerated from repeatedly; mtime and size
+            # change whenever the file is replaced, so stale text is skipped
+            stat = os.stat(pdf_path)
+            cache_key = PDF_PATH_TEXT_CACHE_KEY.format(
+                path=hashlib.blake2b(
+                    os.path.abspath(pdf_path).encode(), digest_size=16
+                ).hexdigest(),
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                max_chars=max_chars or "all",
             )
+            cached = self._read_text_cache(cache_key)
+            if cached is not None:
+                return cached
 
-            # Second pass: Use OCR for pages with no text or very short text
-            if pages_needing_ocr:
-                logger.info(f"Using OCR for pages: {pages_needing_ocr}")
-                try:
-                    for page_num in pages_needing_ocr:
-                        try:
-                            # Load page (0-indexed)
-                            page = doc.load_page(page_num - 1)
-                            # Get image from page
-                            pix = page.get_pixmap(
-                                matrix=fitz.Matrix(2, 2)
-                            )  # 2x zoom for better OCR
-                            img_data = pix.tobytes("png")
-                            image = Image.open(BytesIO(img_data))
-
-                            # Perform OCR on the image
-                            ocr_text = pytesseract.image_to_string(
-                                image, lang="eng+ara"
-                            )
-                            if ocr_text and ocr_text.strip():
-                                ocr_text = ocr_text.strip()
-                                if len(ocr_text.split()) >= 5:
-                                    replaced = False
-                                    for idx, entry in enumerate(text_content):
-                                        match = re.search(r"Page (\d+)", entry)
-                                        if match and int(match.group(1)) == page_num:
-                                            text_content[idx] = (
-                                                f"--- Page {page_num} (OCR) ---\n{ocr_text}"
-                                            )
-                                            replaced = True
-                                            logger.info(
-                                                f"Replaced short text on page {page_num} with OCR content"
-                                            )
-                                            break
-                                    if not replaced:
-                                        text_content.append(
-                                            f"--- Page {page_num} (OCR) ---\n{ocr_text}"
-                                        )
-                                        logger.info(
-                                            f"Successfully extracted OCR text from page {page_num}"
-                                        )
-                        except Exception as e:
-                            logger.warning(f"OCR failed for page {page_num}: {str(e)}")
-                            continue
-                except Exception as e:
-                    logger.warning(f"Failed to convert PDF to images for OCR: {str(e)}")
-
-            if not text_content:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No text content found in PDF. The file may be empty or OCR failed to extract text.",
-                )
-
-            # Sort by page number to maintain order
-            text_content.sort(key=lambda x: int(re.search(r"Page (\d+)", x).group(1)))
-
-            return "\n\n".join(text_content)
+            text = await asyncio.to_thread(
+                self._extract_pdf_text, pdf_path=pdf_path, max_chars=max_chars
+            )
+            self._write_text_cache(cache_key, text, PDF_TEXT_CACHE_TTL)
+            return text
 
         except HTTPException:
             raise
@@ -273,85 +347,15 @@ class PDFTextProcessorMixin:
         if not file.filename.lower().endswith(".pdf"):
             raise HTTPException(status_code=400, detail="File must be a PDF")
 
-        # Extract text from each page with OCR support
-        contents = await file.read()
-        # Use PyMuPDF
-        doc = fitz.open(stream=contents, filetype="pdf")
-
-        pages_content = []
-        pages_with_no_text = []
-
-        # First pass: Try to extract text using PyMuPDF
-        for page_num, page in enumerate(doc, 1):
-            try:
-                text = page.get_text()
-                if text and text.strip():
-                    pages_content.append(
-                        {"page_number": page_num, "content": text.strip()}
-                    )
-                else:
-                    pages_with_no_text.append(page_num)
-            except Exception as e:
-                logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
-                pages_with_no_text.append(page_num)
-
-        # Second pass: Use OCR for pages with no text (likely image-based)
-        # Also attempt OCR for pages that have very short extracted text
-        # (e.g., a title) because the rest of the page might be an image.
-        pages_with_short_text = [
-            p["page_number"] for p in pages_content if len(p["content"].split()) < 5
-        ]
+        # Extract text from each page with OCR support, off the event loop
+        contents = await self._read_pdf_upload(file)
+        pages = await asyncio.to_thread(self._extract_pdf_pages, contents)
 
-        pages_needing_ocr = sorted(set(pages_with_no_text) | set(pages_with_short_text))
-
-        if pages_needing_ocr:
-            logger.info(f"Using OCR for pages: {pages_needing_ocr}")
-            try:
-                for page_num in pages_needing_ocr:
-                    try:
-                        # Load page (0-indexed)
-                        page = doc.load_page(page_num - 1)
-                        # Get image from page
-                        pix = page.get_pixmap(
-                            matrix=fitz.Matrix(2, 2)
-                        )  # 2x zoom for better OCR
-                        img_data = pix.tobytes("png")
-                        image = Image.open(BytesIO(img_data))
-
-                        # Perform OCR on the image
-                        ocr_text = pytesseract.image_to_string(image, lang="eng+ara")
-                        if ocr_text and ocr_text.strip():
-                            ocr_text = ocr_text.strip()
-                            # Prefer OCR text only if it yields substantive content
-                            if len(ocr_text.split()) >= 5:
-                                replaced = False
-                                for idx, p in enumerate(pages_content):
-                                    if p["page_number"] == page_num:
-                                        pages_content[idx]["content"] = ocr_text
-                                        replaced = True
-                                        logger.info(
-                                            f"Replaced short text on page {page_num} with OCR content"
-                                        )
-                                        break
-                                if not replaced:
-                                    pages_content.append(
-                                        {
-                                            "page_number": page_num,
-                                            "content": ocr_text,
-                                        }
-                                    )
-                            else:
-                                logger.info(
-                                    f"OCR on page {page_num} returned only {len(ocr_text.split())} words; keeping original text if present"
-                                )
-                    except Exception as e:
-                        logger.warning(f"OCR failed for page {page_num}: {str(e)}")
-                        continue
-            except Exception as e:
-                logger.warning(f"Failed to convert PDF to images for OCR: {str(e)}")
-
-        # Sort pages by page number to maintain order
-        pages_content.sort(key=lambda x: x["page_number"])
+        # Pages in page-number order
+        pages_content = [
+            {"page_number": page_num, "content": text.strip()}
+            for page_num, (text, _) in sorted(pages.items())
+        ]
 
         if not pages_content:
             raise HTTPException(
@@ -1,7 +1,10 @@
 # app/utils/file_upload.py
 
+import asyncio
 import os
 import uuid
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 from typing import List, Optional
 
@@ -14,6 +17,31 @@ ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
 ALLOWED_AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".m4a", ".aac", ".flac", ".webm"}
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_AUDIO_SIZE = 20 * 1024 * 1024  # 20MB
+MAX_READ_CACHE_SIZE = 64 * 1024 * 1024  # 64MB of recently read stored files
+
+
+class InMemoryUploadFile:
+    """
+    Minimal UploadFile stand-in over bytes that are already in memory.
+    read() stays awaitable for callers written against UploadFile, but
+    does not hop to a thread since there is no I/O behind it.
+    """
+
+    def __init__(self, content: bytes, filename: str):
+        self.file = BytesIO(content)
+        self.filename = filename
+
+    async def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
 
 
 class FileUploadService:
@@ -40,6 +68,11 @@ class FileUploadService:
             # For now, let's stick to the relative path behavior but use the setting.
             self.base_storage_path = Path(settings.upload_dir)
 
+        # LRU of relative_path -> bytes for read_file(); stored files are
+        # UUID-named and never rewritten, so entries only go stale on delete
+        self._read_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._read_cache_size = 0
+
         self._ensure_storage_directories()
 
     def _ensure_storage_directories(self):
@@ -320,10 +353,9 @@ class FileUploadService:
         folder_path.mkdir(parents=True, exist_ok=True)
         file_path = folder_path / uuid_filename
 
-        # Save file
+        # Save file off the event loop
         try:
-            with open(file_path, "wb") as f:
-                f.write(contents)
+            await asyncio.to_thread(file_path.write_bytes, contents)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
@@ -341,6 +373,7 @@ class FileUploadService:
         Returns:
             True if deleted successfully, False otherwise
         """
+        self._evict_cached_file(relative_path)
         try:
             file_path = self.base_storage_path / relative_path
             if file_path.exists() and file_path.is_file():
@@ -363,6 +396,45 @@ class FileUploadService:
         file_path = self.base_storage_path / relative_path
         return file_path if file_path.exists() else None
 
+    async def read_file(self, relative_path: str) -> Optional[bytes]:
+        """
+        Read a stored file without blocking the event loop.
+        Recently read files are served from a size-bounded in-memory cache.
+
+        Args:
+            relative_path: Relative path to the file (e.g., 'user_questions/uuid.pdf')
+
+        Returns:
+            File content or None if the file doesn't exist
+        """
+        cached = self._read_cache.get(relative_path)
+        if cached is not None:
+            self._read_cache.move_to_end(relative_path)
+            return cached
+
+        file_path = self.get_absolute_path(relative_path)
+        if not file_path:
+            return None
+
+        contents = await asyncio.to_thread(file_path.read_bytes)
+
+        # Files larger than the whole budget are returned but never cached
+        if len(contents) <= MAX_READ_CACHE_SIZE:
+            self._evict_cached_file(relative_path)
+            self._read_cache[relative_path] = contents
+            self._read_cache_size += len(contents)
+            while self._read_cache_size > MAX_READ_CACHE_SIZE:
+                _, evicted = self._read_cache.popitem(last=False)
+                self._read_cache_size -= len(evicted)
+
+        return contents
+
+    def _evict_cached_file(self, relative_path: str) -> None:
+        """Drop a file from the read cache."""
+        evicted = self._read_cache.pop(relative_path, None)
+        if evicted is not None:
+            self._read_cache_size -= len(evicted)
+
 
 # Create a singleton instance
 file_upload_service = FileUploadService()
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 # ============================================
 # ENHANCED SYSTEM MESSAGE
@@ -102,55 +102,102 @@ Before finalizing your response, verify:
 REMEMBER: Quality over speed. Take time to ensure each question meets these standards."""
 
 
-def get_difficulty_guide(difficulty: str) -> str:
-    difficulty_guide = {
-        "easy": """
+def get_question_distribution(count: int) -> Tuple[int, int, int]:
+    """Split a question count into (standard, critical thinking, linking)"""
+    # 70% / 20% in integer arithmetic (int(90 * 0.7) is 62, not 63);
+    # linking takes the remainder so the three always add up to count
+    standard_count = count * 7 // 10
+    critical_count = count // 5
+    linking_count = count - standard_count - critical_count
+    return standard_count, critical_count, linking_count
+
+
+DIFFICULTY_GUIDES = {
+    "easy": """
 EASY DIFFICULTY GUIDELINES:
 • Questions should be straightforward and test basic recall
 • Answers should be obvious to someone who studied the material
 • Avoid complex reasoning or multi-step problems
 • Use simple, clear language
 • Focus on fundamental concepts and definitions""",
-        "medium": """
+    "medium": """
 MEDIUM DIFFICULTY GUIDELINES:
 • Questions require understanding and application of concepts
 • Answers require thinking but are achievable with study
 • May involve some problem-solving or analysis
 • Use clear but more technical language
 • Test deeper comprehension beyond memorization""",
-        "hard": """
+    "hard": """
 HARD DIFFICULTY GUIDELINES:
 • Questions demand complex analysis and synthesis
 • Answers require deep understanding and reasoning
 • Involve multi-step problem-solving or evaluation
 • May include novel scenarios or edge cases
 • Test mastery and ability to apply knowledge creatively""",
-    }
-    return difficulty_guide.get(difficulty.lower(), difficulty_guide["medium"])
+}
+
+
+def get_difficulty_guide(difficulty: str) -> str:
+    return DIFFICULTY_GUIDES.get(difficulty.lower(), DIFFICULTY_GUIDES["medium"])
+
+
+PDF_DIFFICULTY_GUIDES = {
+    "easy": "EASY: Straightforward questions testing basic recall from the content",
+    "medium": "MEDIUM: Questions requiring understanding and application of content concepts",
+    "hard": "HARD: Complex questions demanding analysis, synthesis, and deep reasoning",
+}
 
 
 def get_pdf_difficulty_guide(difficulty: str) -> str:
-    difficulty_guide = {
-        "easy": "EASY: Straightforward questions testing basic recall from the content",
-        "medium": "MEDIUM: Questions requiring understanding and application of content concepts",
-        "hard": "HARD: Complex questions demanding analysis, synthesis, and deep reasoning",
-    }
-    return difficulty_guide.get(difficulty.lower(), difficulty_guide["medium"])
+    return PDF_DIFFICULTY_GUIDES.get(
+        difficulty.lower(), PDF_DIFFICULTY_GUIDES["medium"]
+    )
+
+
+PDF_PATH_DIFFICULTY_GUIDES = {
+    "easy": "EASY: Straightforward recall from text.",
+    "medium": "MEDIUM: Understanding and application of text concepts.",
+    "hard": "HARD: Analysis and synthesis of text information.",
+}
 
 
 def get_pdf_path_difficulty_guide(difficulty: str) -> str:
-    difficulty_guide = {
-        "easy": "EASY: Straightforward recall from text.",
-        "medium": "MEDIUM: Understanding and application of text concepts.",
-        "hard": "HARD: Analysis and synthesis of text information.",
-    }
-    return difficulty_guide.get(difficulty.lower(), difficulty_guide["medium"])
+    return PDF_PATH_DIFFICULTY_GUIDES.get(
+        difficulty.lower(), PDF_PATH_DIFFICULTY_GUIDES["medium"]
+    )
+
+
+# Upper bound on the do-not-repeat list, so long questions can't crowd out
+# the content and instructions in the prompt
+PREVIOUS_QUESTIONS_MAX_CHARS = 4000
+
+
+def get_recent_unique_questions(
+    previous_questions: List[str],
+    limit: int,
+    max_chars: int = PREVIOUS_QUESTIONS_MAX_CHARS,
+) -> List[str]:
+    """Latest distinct questions within `limit` and `max_chars`, in generation order"""
+    recent = []
+    total_chars = 0
+    for question in dict.fromkeys(reversed(previous_questions)):
+        if not question:
+            continue
+        total_chars += len(question)
+        if len(recent) >= limit or total_chars > max_chars:
+            break
+        recent.append(question)
+    recent.reverse()
+    return recent
 
 
 def get_previous_questions_context(previous_questions: Optional[List[str]]) -> str:
     if previous_questions and len(previous_questions) > 0:
         questions_list = "\n".join(
-            [f"  {i+1}. {q}" for i, q in enumerate(previous_questions[:30])]
+            f"  {i}. {q}"
+            for i, q in enumerate(
+                get_recent_unique_questions(previous_questions, 30), 1
+            )
         )
         return f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -174,7 +221,10 @@ Think: "What haven't I asked yet about this topic?"
 def get_pdf_previous_questions_context(previous_questions: Optional[List[str]]) -> str:
     if previous_questions and len(previous_questions) > 0:
         questions_list = "\n".join(
-            [f"  {i+1}. {q}" for i, q in enumerate(previous_questions[:30])]
+            f"  {i}. {q}"
+            for i, q in enumerate(
+                get_recent_unique_questions(previous_questions, 30), 1
+            )
         )
         return f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -192,7 +242,9 @@ def get_pdf_path_previous_questions_context(
     previous_questions: Optional[List[str]],
 ) -> str:
     if previous_questions and len(previous_questions) > 0:
-        questions_list = "\n".join([f"- {q}" for q in previous_questions[:20]])
+        questions_list = "- " + "\n- ".join(
+            get_recent_unique_questions(previous_questions, 20)
+        )
         return f"\n\nDO NOT REPEAT:\n{questions_list}\n"
     return ""
 
@@ -437,11 +489,12 @@ def get_mixed_prompt(
     standard_count,
     critical_count,
     linking_count,
-    mcq_count,
-    tf_count,
     notes_context,
     previous_context,
 ):
+    mcq_count = count * 13 // 20
+    tf_count = count - mcq_count
+
     return f"""Generate {count} UNIQUE MIXED questions (MCQ + True/False) about: {topic}
 
 {current_difficulty_guide}
@@ -570,12 +623,13 @@ def get_pdf_mixed_prompt(
     standard_count,
     critical_count,
     linking_count,
-    mcq_count,
-    tf_count,
     notes_context,
     previous_context,
     pdf_content,
 ):
+    mcq_count = count * 13 // 20
+    tf_count = count - mcq_count
+
     return f"""Based on the following content, generate {count} UNIQUE MIXED questions.
 
 {current_difficulty_guide}
@@ -1087,7 +1141,7 @@ def get_teaching_greeting_system_message(language, user_name, session_type):
         )
 
         if session_type == "explaining":
-            return f"""أنت معلم خبير ودود. مهمتك هي الترحيب بالطالب وشرح المحتوى له بطريقة واضحة خطوة بخطوة.{student_name_instruction}
+            return f"""أنت معلم خبير ودود. مهمتك هي الترحيب بالطالب وشرح المحتوى له بطريقة واضحة خطوة بخطوة.
 
             قواعد مهمة:
             - رحب بالطالب بطريقة ودية
@@ -1103,9 +1157,9 @@ def get_teaching_greeting_system_message(language, user_name, session_type):
             - طبيعي وودي
             - محفز ومشجع
             - مباشر للموضوع
-            - ابدأ بشرح الصفحة الأولى فوراً بعد الترحيب"""
+            - ابدأ بشرح الصفحة الأولى فوراً بعد الترحيب{student_name_instruction}"""
         else:  # asking session
-            return f"""أنت معلم خبير ودود. مهمتك هي الترحيب بالطالب وبدء جلسة تعليمية تفاعلية.{student_name_instruction}
+            return f"""أنت معلم خبير ودود. مهمتك هي الترحيب بالطالب وبدء جلسة تعليمية تفاعلية.
 
 قواعد مهمة:
 - رحب بالطالب بطريقة ودية
@@ -1117,7 +1171,7 @@ def get_teaching_greeting_system_message(language, user_name, session_type):
 أسلوب التحية:
 - طبيعي وودي
 - محفز ومشجع
-- مباشر للموضوع"""
+- مباشر للموضوع{student_name_instruction}"""
     else:  # English
         student_name_instruction = (
             f"\n\nStudent's name: {user_name}\nUse the student's name in the greeting."
@@ -1126,7 +1180,7 @@ def get_teaching_greeting_system_message(language, user_name, session_type):
         )
 
         if session_type == "explaining":
-            return f"""You are a friendly expert teacher. Your task is to welcome the student and start explaining the content step by step.{student_name_instruction}
+            return f"""You are a friendly expert teacher. Your task is to welcome the student and start explaining the content step by step.
 
 Important rules:
 - Greet the student in a friendly manner
@@ -1142,9 +1196,9 @@ Greeting style:
 - Natural and friendly
 - Motivating and encouraging
 - Straight to the topic
-- Begin explaining the first page right after the welcome"""
+- Begin explaining the first page right after the welcome{student_name_instruction}"""
         else:  # asking session
-            return f"""You are a friendly expert teacher. Your task is to welcome the student and start an interactive learning session.{student_name_instruction}
+            return f"""You are a friendly expert teacher. Your task is to welcome the student and start an interactive learning session.
 
 Important rules:
 - Greet the student in a friendly manner
@@ -1156,7 +1210,7 @@ Important rules:
 Greeting style:
 - Natural and friendly
 - Motivating and encouraging
-- Straight to the topic"""
+- Straight to the topic{student_name_instruction}"""
 
 
 def get_teaching_greeting_prompt(language, content_preview, session_type):
@@ -1197,7 +1251,7 @@ def get_teaching_response_system_message(language, user_name, session_type):
         )
 
         if session_type == "explaining":
-            return f"""أنت معلم خبير تشرح المحتوى للطالب بطريقة واضحة ومبسطة صفحة بصفحة.{student_name_instruction}
+            return f"""أنت معلم خبير تشرح المحتوى للطالب بطريقة واضحة ومبسطة صفحة بصفحة.
 
     ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     🎯 دورك كمعلم (شرح المحتوى)
@@ -1243,9 +1297,9 @@ def get_teaching_response_system_message(language, user_name, session_type):
     - "فهمت الصفحة دي كويس؟ جاهز ننتقل للصفحة اللي بعدها؟"
     - "في نقطة في الصفحة دي تحب أشرحها أكتر؟"
     - "عايز أمثلة إضافية على موضوع معين من الصفحة؟"
-    """
+    {student_name_instruction}"""
         else:  # asking session
-            return f"""أنت معلم خبير تساعد الطالب على فهم المحتوى من خلال محادثة تفاعلية.{student_name_instruction}
+            return f"""أنت معلم خبير تساعد الطالب على فهم المحتوى من خلال محادثة تفاعلية.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🎯 دورك كمعلم
@@ -1318,14 +1372,14 @@ def get_teaching_response_system_message(language, user_name, session_type):
 - "هل تحب نكمل في أسئلة تانية؟"
 - "في نقطة معينة عايز أشرحها أكتر؟"
 - "جاهز للسؤال التالي؟"
-"""
+{student_name_instruction}"""
     else:  # English
         student_name_instruction = (
             f"\n\n👤 Student's Name: {user_name}\nUse the student's name naturally in the conversation to make it more personal and friendly."
             if user_name
             else ""
         )
-        return f"""You are an expert teacher helping the student understand content through interactive conversation.{student_name_instruction}
+        return f"""You are an expert teacher helping the student understand content through interactive conversation.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🎯 Your Role as Teacher
@@ -1418,7 +1472,7 @@ Example guidance questions:
 - "Would you like to continue with more questions?"
 - "Is there any specific point you'd like me to explain further?"
 - "Ready for the next question?"
-"""
+{student_name_instruction}"""
 
 
 def get_teaching_response_prompt(language, truncated_content, user_message):
@@ -26,6 +26,7 @@ from app.core.limiter import custom_rate_limit_exceeded_handler, limiter
 from app.core.schedular import shutdown_scheduler, start_scheduler
 from app.models import *
 from app.routers import routes
+from app.utils.ai import ai_service
 
 # ============================================================================
 # Directory Setup
@@ -146,6 +147,10 @@ async def lifespan(app: FastAPI):
         shutdown_scheduler(scheduler)
         logger.info("✓ Usage tracking scheduler stopped")
 
+    # Release pooled AI API connections
+    await ai_service.close()
+    logger.info("✓ AI client closed")
+
     logger.info("✓ Application shutdown completed")
 
 
@@ -0,0 +1,30 @@
+"""add_ugq_attempt_lookup_indexes
+
+Revision ID: 2f8d6c0e7b15
+Revises: 9e4b3f6a1c28
+Create Date: 2026-10-17 11:40:07.918264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8d6c0e7b15'
+down_revision: Union[str, None] = '9e4b3f6a1c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ugqa_uid_qsid_ic', 'user_generated_question_attempts', ['user_id', 'question_set_id', 'is_completed'], unique=False)
+    op.create_index('ix_ugqa_pending', 'user_generated_question_attempts', ['user_id', 'question_set_id'], unique=False, postgresql_where=sa.text('is_completed = false'))
+    op.create_index('ix_ugq_public_created_at', 'user_generated_questions', ['is_public', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ugq_public_created_at', table_name='user_generated_questions')
+    op.drop_index('ix_ugqa_pending', table_name='user_generated_question_attempts', postgresql_where=sa.text('is_completed = false'))
+    op.drop_index('ix_ugqa_uid_qsid_ic', table_name='user_generated_question_attempts')
@@ -0,0 +1,62 @@
+"""normalize_ugq_questions_into_items
+
+Revision ID: 5c1e7a9b2d40
+Revises: 8d5cc7c004b0
+Create Date: 2026-10-17 10:12:31.482903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9b2d40'
+down_revision: Union[str, None] = '8d5cc7c004b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_generated_question_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_set_id', sa.Integer(), nullable=False),
+    sa.Column('idx', sa.Integer(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['question_set_id'], ['user_generated_questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('question_set_id', 'idx', name='uq_ugq_items_question_set_idx', deferrable=True, initially='DEFERRED')
+    )
+
+    # Move every question out of the JSONB array, keeping its position
+    op.execute(
+        """
+        INSERT INTO user_generated_question_items (question_set_id, idx, data)
+        SELECT q.id, e.ordinality - 1, e.value
+        FROM user_generated_questions q,
+             jsonb_array_elements(q.questions) WITH ORDINALITY AS e(value, ordinality)
+        """
+    )
+
+    op.drop_column('user_generated_questions', 'questions')
+
+
+def downgrade() -> None:
+    op.add_column('user_generated_questions', sa.Column('questions', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'[]'::jsonb"), nullable=False))
+
+    op.execute(
+        """
+        UPDATE user_generated_questions q
+        SET questions = i.questions
+        FROM (
+            SELECT question_set_id, jsonb_agg(data ORDER BY idx) AS questions
+            FROM user_generated_question_items
+            GROUP BY question_set_id
+        ) i
+        WHERE i.question_set_id = q.id
+        """
+    )
+
+    op.drop_table('user_generated_question_items')
@@ -0,0 +1,30 @@
+"""add_ugq_search_trigram_indexes
+
+Revision ID: 7a3c9e1f5d62
+Revises: 2f8d6c0e7b15
+Create Date: 2026-10-17 12:15:42.603118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c9e1f5d62'
+down_revision: Union[str, None] = '2f8d6c0e7b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_ugq_title_trgm', 'user_generated_questions', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_ugq_topic_trgm', 'user_generated_questions', ['topic'], unique=False, postgresql_using='gin', postgresql_ops={'topic': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ugq_topic_trgm', table_name='user_generated_questions', postgresql_using='gin')
+    op.drop_index('ix_ugq_title_trgm', table_name='user_generated_questions', postgresql_using='gin')
+    # pg_trgm is left installed; other objects may depend on it
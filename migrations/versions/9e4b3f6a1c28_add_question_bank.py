@@ -0,0 +1,90 @@
+"""add_question_bank
+
+Revision ID: 9e4b3f6a1c28
+Revises: 5c1e7a9b2d40
+Create Date: 2026-10-17 11:03:54.210377
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b3f6a1c28'
+down_revision: Union[str, None] = '5c1e7a9b2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+
+def _hash_question(question):
+    # Must match QuestionBank.hash_question
+    canonical = json.dumps(
+        question, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+def upgrade() -> None:
+    op.create_table('question_bank',
+    sa.Column('hash', sa.LargeBinary(length=16), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('user_generated_question_items', sa.Column('question_hash', sa.LargeBinary(length=16), nullable=True))
+
+    # Hash every stored question into the bank and point its item at it,
+    # reading keyset pages of items and writing each page as one batch
+    bind = op.get_bind()
+    question_bank = sa.table(
+        'question_bank',
+        sa.column('hash', sa.LargeBinary(length=16)),
+        sa.column('data', postgresql.JSONB(astext_type=sa.Text())),
+    )
+    select_page = sa.text(
+        'SELECT id, data FROM user_generated_question_items '
+        'WHERE id > :last_id ORDER BY id LIMIT :limit'
+    )
+    last_id = 0
+    while True:
+        items = bind.execute(select_page, {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not items:
+            break
+        last_id = items[-1][0]
+        batch = [(item_id, _hash_question(data), data) for item_id, data in items]
+        bodies = {question_hash: data for _, question_hash, data in batch}
+        bind.execute(
+            postgresql.insert(question_bank).on_conflict_do_nothing(index_elements=['hash']),
+            [{'hash': question_hash, 'data': data} for question_hash, data in bodies.items()],
+        )
+        bind.execute(
+            sa.text('UPDATE user_generated_question_items SET question_hash = :hash WHERE id = :id'),
+            [{'hash': question_hash, 'id': item_id} for item_id, question_hash, _ in batch],
+        )
+
+    op.alter_column('user_generated_question_items', 'question_hash', nullable=False)
+    op.create_foreign_key('fk_ugq_items_question_hash', 'user_generated_question_items', 'question_bank', ['question_hash'], ['hash'])
+    op.drop_column('user_generated_question_items', 'data')
+
+
+def downgrade() -> None:
+    op.add_column('user_generated_question_items', sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.execute(
+        """
+        UPDATE user_generated_question_items i
+        SET data = b.data
+        FROM question_bank b
+        WHERE b.hash = i.question_hash
+        """
+    )
+    op.alter_column('user_generated_question_items', 'data', nullable=False)
+    op.drop_constraint('fk_ugq_items_question_hash', 'user_generated_question_items', type_='foreignkey')
+    op.drop_column('user_generated_question_items', 'question_hash')
+    op.drop_table('question_bank')
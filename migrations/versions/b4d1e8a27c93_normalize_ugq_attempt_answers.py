@@ -0,0 +1,80 @@
+"""normalize_ugq_attempt_answers
+
+Revision ID: b4d1e8a27c93
+Revises: 7a3c9e1f5d62
+Create Date: 2026-10-17 15:41:08.217364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d1e8a27c93'
+down_revision: Union[str, None] = '7a3c9e1f5d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_generated_question_answers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('attempt_id', sa.Integer(), nullable=False),
+    sa.Column('question_index', sa.Integer(), nullable=False),
+    sa.Column('selected_answer', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('correct_answer', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['attempt_id'], ['user_generated_question_attempts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_generated_question_answers_attempt_id'), 'user_generated_question_answers', ['attempt_id'], unique=False)
+
+    # Move every answer out of the JSONB array into its own row
+    op.execute(
+        """
+        INSERT INTO user_generated_question_answers
+            (attempt_id, question_index, selected_answer, correct_answer, is_correct)
+        SELECT a.id,
+               (e.value->>'question_index')::int,
+               e.value->'selected_answer',
+               e.value->'correct_answer',
+               COALESCE((e.value->>'is_correct')::boolean, false)
+        FROM user_generated_question_attempts a,
+             jsonb_array_elements(a.answers) AS e(value)
+        WHERE jsonb_typeof(a.answers) = 'array'
+        """
+    )
+
+    op.drop_column('user_generated_question_attempts', 'answers')
+
+
+def downgrade() -> None:
+    op.add_column('user_generated_question_attempts', sa.Column('answers', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    op.execute(
+        """
+        UPDATE user_generated_question_attempts a
+        SET answers = r.answers
+        FROM (
+            SELECT attempt_id,
+                   jsonb_agg(
+                       jsonb_build_object(
+                           'question_index', question_index,
+                           'selected_answer', selected_answer,
+                           'correct_answer', correct_answer,
+                           'is_correct', is_correct
+                       )
+                       ORDER BY question_index
+                   ) AS answers
+            FROM user_generated_question_answers
+            GROUP BY attempt_id
+        ) r
+        WHERE r.attempt_id = a.id
+        """
+    )
+
+    op.drop_index(op.f('ix_user_generated_question_answers_attempt_id'), table_name='user_generated_question_answers')
+    op.drop_table('user_generated_question_answers')